@@ -0,0 +1,273 @@
+"""Розсилка повідомлення всім користувачам у межах лімітів Telegram.
+
+- Отримувачі читаються з таблиці users батчами за зростанням id (keyset-пагінація),
+  тому пам'ять не залежить від кількості користувачів.
+- Надсилання — з обмеженою кількістю одночасних запитів і рівномірним темпом
+  (Telegram дозволяє ~30 повідомлень/с на бота). RetryAfter зупиняє всю розсилку
+  на вказаний час, а не лише один запит.
+- Після кожного батчу в broadcasts записується контрольна точка (last_user_id і
+  лічильники), тому після падіння розсилка продовжується з місця зупинки. Повторно
+  може отримати повідомлення щонайбільше один незавершений батч.
+- Користувачі, що заблокували бота (Forbidden), позначаються is_blocked і надалі
+  пропускаються.
+- У режимі кількох ботів (TENANTS_CONFIG) розсилка йде від імені одного бота (--tenant,
+  токен з конфігурації) лише користувачам, що писали цьому боту (user_tenants), а
+  блокування позначається для пари (користувач, бот).
+
+Приклади:
+    python -m app.admin.broadcast send "Додано нові шаблони резюме!"
+    python -m app.admin.broadcast send --tenant it_cv "New templates!"
+    python -m app.admin.broadcast resume 3
+    python -m app.admin.broadcast status 3
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session as DBSession
+from telegram.error import Forbidden, NetworkError, RetryAfter, TelegramError
+
+from app.core import config
+from app.models.orm import Broadcast, User, UserTenant
+
+DELIVERED = "delivered"
+FAILED = "failed"
+BLOCKED = "blocked"
+
+# Повтори після тимчасових мережевих помилок (RetryAfter не рахується)
+MAX_RETRIES = 3
+
+Sender = Callable[[int, str], Awaitable[object]]
+
+
+@dataclass
+class BroadcastReport:
+    broadcast_id: int
+    status: str
+    delivered: int
+    failed: int
+    blocked: int
+    elapsed: float = 0.0
+    # Надіслано за цей запуск (без урахування попередніх до відновлення)
+    sent_this_run: int = 0
+
+    @property
+    def throughput(self) -> float:
+        return self.sent_this_run / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        text = (f"Розсилка #{self.broadcast_id} ({self.status}): доставлено {self.delivered}, "
+                f"помилок {self.failed}, заблокували бота {self.blocked}")
+        if self.elapsed:
+            text += f"; {self.throughput:.1f} повідомлень/с"
+        return text
+
+
+class RateLimiter:
+    """Рівномірний темп: не частіше ніж `rate` запитів на секунду для всіх корутин."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._next_slot = 0.0
+
+    async def acquire(self) -> None:
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def pause(self, seconds: float) -> None:
+        """Після RetryAfter усі наступні запити чекають щонайменше `seconds`."""
+        resume_at = asyncio.get_running_loop().time() + seconds
+        self._next_slot = max(self._next_slot, resume_at)
+
+
+def _retry_after_seconds(error: RetryAfter) -> float:
+    # У нових версіях python-telegram-bot retry_after — timedelta
+    value = error.retry_after
+    return value.total_seconds() if isinstance(value, timedelta) else float(value)
+
+
+async def _deliver(send: Sender, chat_id: int, text: str, limiter: RateLimiter,
+                   semaphore: asyncio.Semaphore) -> str:
+    async with semaphore:
+        retries = 0
+        while True:
+            await limiter.acquire()
+            try:
+                await send(chat_id, text)
+                return DELIVERED
+            except Forbidden:
+                return BLOCKED
+            except RetryAfter as e:
+                limiter.pause(_retry_after_seconds(e))
+            except NetworkError as e:
+                retries += 1
+                if retries > MAX_RETRIES:
+                    print(f"Broadcast to {chat_id} failed: {e}")
+                    return FAILED
+                await asyncio.sleep(retries)
+            except TelegramError as e:
+                # Напр. BadRequest "chat not found" — повтор не допоможе
+                print(f"Broadcast to {chat_id} failed: {e}")
+                return FAILED
+
+
+def create_broadcast(db: DBSession, text: str, tenant: Optional[str] = None) -> Broadcast:
+    broadcast = Broadcast(text=text, tenant=tenant)
+    db.add(broadcast)
+    db.commit()
+    db.refresh(broadcast)
+    return broadcast
+
+
+def _report(broadcast: Broadcast, elapsed: float = 0.0, sent_this_run: int = 0) -> BroadcastReport:
+    return BroadcastReport(broadcast.id, broadcast.status, broadcast.delivered, broadcast.failed,
+                           broadcast.blocked, elapsed, sent_this_run)
+
+
+async def run_broadcast(db: DBSession, broadcast_id: int, send: Sender,
+                        rate: float = config.BROADCAST_RATE_PER_SECOND,
+                        concurrency: int = config.BROADCAST_CONCURRENCY,
+                        batch_size: int = config.BROADCAST_BATCH_SIZE,
+                        progress_every: float = 5.0, log=None) -> BroadcastReport:
+    """Надсилає (або продовжує) розсилку з контрольної точки. Повертає підсумок."""
+    log = log or (lambda message: print(message, file=sys.stderr))
+    broadcast = db.get(Broadcast, broadcast_id)
+    if broadcast is None:
+        raise ValueError(f"Розсилку #{broadcast_id} не знайдено")
+    if broadcast.status == "done":
+        return _report(broadcast)
+
+    broadcast.status = "running"
+    db.commit()
+
+    limiter = RateLimiter(rate)
+    semaphore = asyncio.Semaphore(concurrency)
+    sent = 0
+    start = last_report = time.perf_counter()
+
+    if broadcast.tenant is None:
+        recipients = select(User.id, User.telegram_id).where(User.is_blocked.is_(False))
+    else:
+        # Лише ті, хто писав цьому боту: іншим він надіслати не може (Forbidden)
+        recipients = (select(User.id, User.telegram_id)
+                      .join(UserTenant, UserTenant.user_id == User.id)
+                      .where(UserTenant.tenant == broadcast.tenant, UserTenant.is_blocked.is_(False)))
+
+    while True:
+        # Лише колонки, без ORM-об'єктів; курсор не тримаємо відкритим між комітами
+        rows = db.execute(
+            recipients.where(User.id > broadcast.last_user_id).order_by(User.id).limit(batch_size)
+        ).all()
+        if not rows:
+            break
+
+        outcomes = await asyncio.gather(
+            *(_deliver(send, row.telegram_id, broadcast.text, limiter, semaphore) for row in rows))
+
+        blocked_ids = [row.id for row, outcome in zip(rows, outcomes) if outcome == BLOCKED]
+        if blocked_ids and broadcast.tenant is None:
+            db.execute(update(User).where(User.id.in_(blocked_ids)).values(is_blocked=True))
+        elif blocked_ids:
+            db.execute(update(UserTenant)
+                       .where(UserTenant.user_id.in_(blocked_ids), UserTenant.tenant == broadcast.tenant)
+                       .values(is_blocked=True))
+        broadcast.delivered += outcomes.count(DELIVERED)
+        broadcast.failed += outcomes.count(FAILED)
+        broadcast.blocked += len(blocked_ids)
+        broadcast.last_user_id = rows[-1].id
+        db.commit()  # контрольна точка
+
+        sent += len(rows)
+        now = time.perf_counter()
+        if now - last_report >= progress_every:
+            log(_report(broadcast, now - start, sent).summary())
+            last_report = now
+
+    broadcast.status = "done"
+    db.commit()
+    report = _report(broadcast, time.perf_counter() - start, sent)
+    log(report.summary())
+    return report
+
+
+def _bot_token(tenant: Optional[str]) -> str:
+    """Токен бота розсилки: орендаря з TENANTS_CONFIG або TELEGRAM_BOT_TOKEN."""
+    if tenant is None:
+        token = os.getenv("TELEGRAM_BOT_TOKEN")
+        if not token:
+            raise SystemExit("ПОМИЛКА: TELEGRAM_BOT_TOKEN не знайдено у змінних оточення.")
+        return token
+
+    from app.bot.tenants import load_tenants
+
+    if not config.TENANTS_CONFIG:
+        raise SystemExit(f"ПОМИЛКА: розсилка бота {tenant} потребує TENANTS_CONFIG.")
+    for entry in load_tenants(config.TENANTS_CONFIG):
+        if entry.name == tenant:
+            return entry.token
+    raise SystemExit(f"ПОМИЛКА: бота {tenant} немає в {config.TENANTS_CONFIG}.")
+
+
+async def _send_with_bot(db: DBSession, broadcast: Broadcast, batch_size: int) -> BroadcastReport:
+    from telegram import Bot
+
+    token = _bot_token(broadcast.tenant)
+    async with Bot(token) as bot:
+        async def send(chat_id: int, text: str):
+            return await bot.send_message(chat_id=chat_id, text=text)
+
+        return await run_broadcast(db, broadcast.id, send, batch_size=batch_size)
+
+
+def main(argv: Optional[list] = None):
+    from app.core.database import get_db, init_db
+
+    parser = argparse.ArgumentParser(description="Розсилка користувачам CV on the Go")
+    commands = parser.add_subparsers(dest="command", required=True)
+    send_parser = commands.add_parser("send", help="Створити і запустити нову розсилку")
+    send_parser.add_argument("text")
+    send_parser.add_argument("--tenant", help="Бот з TENANTS_CONFIG (обов'язково в режимі кількох ботів)")
+    resume_parser = commands.add_parser("resume", help="Продовжити розсилку з контрольної точки")
+    resume_parser.add_argument("broadcast_id", type=int)
+    status_parser = commands.add_parser("status", help="Показати стан розсилки")
+    status_parser.add_argument("broadcast_id", type=int)
+    for command_parser in (send_parser, resume_parser):
+        command_parser.add_argument("--batch-size", type=int, default=config.BROADCAST_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    # Таблиці broadcasts, user_tenants і нові колонки з'являються й без перезапуску бота
+    init_db()
+    db = get_db()
+    try:
+        if args.command != "send":
+            broadcast = db.get(Broadcast, args.broadcast_id)
+            if broadcast is None:
+                parser.error(f"Розсилку #{args.broadcast_id} не знайдено")
+        if args.command == "status":
+            bot = f"бот {broadcast.tenant}; " if broadcast.tenant else ""
+            print(f"{_report(broadcast).summary()}; {bot}остання точка: user_id={broadcast.last_user_id}")
+            return
+
+        if args.command == "send":
+            if config.TENANTS_CONFIG and not args.tenant:
+                # Інакше один бот писав би користувачам інших ботів і позначав їх заблокованими
+                parser.error("У режимі кількох ботів (TENANTS_CONFIG) вкажіть --tenant")
+            _bot_token(args.tenant)  # помилка конфігурації — до створення розсилки
+            broadcast = create_broadcast(db, args.text, args.tenant)
+            print(f"Створено розсилку #{broadcast.id}")
+        asyncio.run(_send_with_bot(db, broadcast, args.batch_size))
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+"""Потоковий експорт даних (users, sessions, resumes) для аналітики та бекапів.
+
+Рядки читаються батчами (yield_per / server-side cursor) і одразу пишуться у файл,
+тому пам'ять не залежить від розміру таблиці.
+
+Приклади:
+    python -m app.admin.export_data sessions -o sessions.jsonl.gz --compression gzip
+    python -m app.admin.export_data resumes -o resumes.csv
+    python -m app.admin.export_data users -o users.parquet --format parquet
+"""
+import argparse
+import bz2
+import csv
+import gzip
+import json
+import lzma
+import sys
+import time
+from datetime import datetime
+from typing import Iterator, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session as DBSession
+
+from app.core.database import get_db
+from app.logic.session_manager import build_resume_dict
+from app.models.orm import User, Session, Resume
+from app.models.schemas import ResumeData
+
+BATCH_SIZE = 1000
+
+# Таблиця -> колонки для SELECT (без ORM-об'єктів, щоб не наповнювати identity map)
+TABLE_COLUMNS = {
+    "users": (User.id, User.telegram_id, User.first_name, User.last_name, User.username,
+              User.is_blocked, User.created_at, User.last_active_at),
+    "sessions": (Session.id, Session.user_id, Session.current_step, Session.context, Session.updated_at),
+    "resumes": (Resume.id, Resume.user_id, Resume.template_id, Resume.title, Resume.language,
+                Resume.data, Resume.is_draft, Resume.created_at, Resume.updated_at),
+}
+
+# Явна схема parquet для кожної таблиці: інакше тип колонки, порожньої в першому батчі,
+# виводиться як null і наступні батчі з рядками в ній не записуються.
+# Дати та вкладені структури (resume) пишуться рядками, як у _to_record/_flatten.
+PARQUET_COLUMNS = {
+    "users": {"id": "int64", "telegram_id": "int64", "first_name": "string", "last_name": "string",
+              "username": "string", "is_blocked": "bool_", "created_at": "string", "last_active_at": "string"},
+    "sessions": {"id": "int64", "user_id": "int64", "current_step": "string", "updated_at": "string",
+                 "resume": "string", "validation_error": "string"},
+    "resumes": {"id": "int64", "user_id": "int64", "template_id": "int64", "title": "string",
+                "language": "string", "is_draft": "bool_", "created_at": "string", "updated_at": "string",
+                "resume": "string", "validation_error": "string"},
+}
+
+COMPRESSORS = {
+    "none": open,
+    "gzip": gzip.open,
+    "bz2": bz2.open,
+    "xz": lzma.open,
+}
+
+
+def _validate_resume(resume_dict: dict) -> dict:
+    """Проганяє дані через ResumeData; помилку валідації записуємо, а не падаємо."""
+    try:
+        return {"resume": ResumeData(**resume_dict).model_dump(), "validation_error": None}
+    except Exception as e:
+        return {"resume": None, "validation_error": str(e)}
+
+
+def _to_record(table: str, row) -> dict:
+    record = dict(row._mapping)
+    if table == "sessions":
+        record.update(_validate_resume(build_resume_dict(record.pop("context"))))
+    elif table == "resumes":
+        record.update(_validate_resume(record.pop("data") or {}))
+    for key, value in record.items():
+        if isinstance(value, datetime):
+            record[key] = value.isoformat()
+    return record
+
+
+def iter_records(db: DBSession, table: str, batch_size: int = BATCH_SIZE) -> Iterator[list]:
+    """Повертає записи батчами. stream_results вмикає server-side cursor (Postgres)."""
+    stmt = (
+        select(*TABLE_COLUMNS[table])
+        .order_by(TABLE_COLUMNS[table][0])
+        .execution_options(yield_per=batch_size, stream_results=True)
+    )
+    result = db.execute(stmt)
+    for partition in result.partitions():
+        yield [_to_record(table, row) for row in partition]
+
+
+# --- ЗАПИСУВАЧІ ---
+
+class JSONLWriter:
+    def __init__(self, path: str, compression: str, table: str):
+        self.file = COMPRESSORS[compression](path, "wt", encoding="utf-8")
+
+    def write_batch(self, records: list) -> None:
+        for record in records:
+            self.file.write(json.dumps(record, ensure_ascii=False))
+            self.file.write("\n")
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def _flatten(record: dict) -> dict:
+    # Вкладені структури (resume) серіалізуємо в JSON-рядок
+    return {key: json.dumps(value, ensure_ascii=False) if isinstance(value, (dict, list)) else value
+            for key, value in record.items()}
+
+
+class CSVWriter:
+    def __init__(self, path: str, compression: str, table: str):
+        self.file = COMPRESSORS[compression](path, "wt", encoding="utf-8", newline="")
+        self.writer = None
+
+    def write_batch(self, records: list) -> None:
+        for record in records:
+            if self.writer is None:
+                self.writer = csv.DictWriter(self.file, fieldnames=list(record.keys()))
+                self.writer.writeheader()
+            self.writer.writerow(_flatten(record))
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class ParquetWriter:
+    """Потребує pyarrow (опційна залежність). compression: none/gzip/zstd/snappy..."""
+
+    def __init__(self, path: str, compression: str, table: str):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Для формату parquet встановіть pyarrow: pip install pyarrow")
+        self.pa, self.pq = pa, pq
+        self.path = path
+        self.compression = "snappy" if compression == "none" else compression
+        self.schema = pa.schema([(name, getattr(pa, type_name)())
+                                 for name, type_name in PARQUET_COLUMNS[table].items()])
+        self.writer = None
+
+    def write_batch(self, records: list) -> None:
+        if not records:
+            return
+        table = self.pa.Table.from_pylist([_flatten(r) for r in records], schema=self.schema)
+        if self.writer is None:
+            self.writer = self.pq.ParquetWriter(self.path, self.schema, compression=self.compression)
+        self.writer.write_table(table)
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+
+
+WRITERS = {"jsonl": JSONLWriter, "csv": CSVWriter, "parquet": ParquetWriter}
+
+
+def export_table(db: DBSession, table: str, path: str, fmt: str = "jsonl", compression: str = "none",
+                 batch_size: int = BATCH_SIZE, progress_every: float = 5.0, log=None) -> int:
+    """Експортує таблицю у файл. Повертає кількість записаних рядків."""
+    log = log or (lambda message: print(message, file=sys.stderr))
+    writer = WRITERS[fmt](path, compression, table)
+    rows = 0
+    start = last_report = time.perf_counter()
+    try:
+        for records in iter_records(db, table, batch_size):
+            writer.write_batch(records)
+            rows += len(records)
+            now = time.perf_counter()
+            if now - last_report >= progress_every:
+                log(f"{table}: {rows} рядків, {rows / (now - start):.0f} рядків/с")
+                last_report = now
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    log(f"{table}: готово, {rows} рядків за {elapsed:.1f} с ({rows / elapsed if elapsed else 0:.0f} рядків/с)")
+    return rows
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Потоковий експорт даних CV on the Go")
+    parser.add_argument("table", choices=sorted(TABLE_COLUMNS))
+    parser.add_argument("-o", "--output", required=True, help="Шлях до вихідного файлу")
+    parser.add_argument("-f", "--format", choices=sorted(WRITERS),
+                        help="За замовчуванням визначається з розширення файлу (інакше jsonl)")
+    parser.add_argument("-c", "--compression", default="none",
+                        help="jsonl/csv: none, gzip, bz2, xz; parquet: none, snappy, gzip, zstd")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    if args.format is None:
+        suffixes = [part for part in args.output.lower().split(".")[1:] if part in WRITERS]
+        args.format = suffixes[-1] if suffixes else "jsonl"
+
+    if args.format != "parquet" and args.compression not in COMPRESSORS:
+        parser.error(f"Невідоме стиснення для {args.format}: {args.compression}")
+
+    db = get_db()
+    try:
+        export_table(db, args.table, args.output, args.format, args.compression, args.batch_size)
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
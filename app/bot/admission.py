@@ -0,0 +1,140 @@
+"""Контроль допуску: обмеження частоти запитів перед обробниками бота.
+
+- Кожен користувач має token bucket; команда списує токени відповідно до своєї вартості
+  (рендер PDF коштує набагато більше, ніж текстовий крок діалогу).
+- Окремий глобальний бюджет на рендери, щоб кілька активних користувачів не
+  забрали весь CPU. Він списується лише за новий рендер (handlers.generate_command
+  через admit_render), а не за повторний /generate чи відповідь з кешу.
+"""
+import functools
+import math
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from app.core import config
+
+# Вартість типів запитів (у токенах)
+COST_TEXT = 1
+COST_COMMAND = 2
+COST_EXPORT = 3
+COST_PHOTO = 5
+COST_RENDER = 10
+
+
+class TokenBucket:
+    def __init__(self, capacity: float, refill_per_second: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.clock = clock
+        self.tokens = capacity
+        self.updated_at = clock()
+        # До цього моменту користувач уже знає про ліміт — повторно не відповідаємо
+        self.notified_until = 0.0
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_per_second)
+        self.updated_at = now
+
+    def wait_time(self, cost: float) -> float:
+        """Скільки секунд чекати, доки вистачить токенів (0 — можна зараз)."""
+        self._refill()
+        if self.tokens >= cost:
+            return 0.0
+        return (cost - self.tokens) / self.refill_per_second
+
+    def consume(self, cost: float) -> None:
+        self._refill()
+        self.tokens -= cost
+
+
+class AdmissionController:
+    def __init__(self, user_capacity: float = 20, user_refill_per_second: float = 0.5,
+                 render_budget_per_minute: float = 30, render_burst: float = 5,
+                 max_tracked_users: int = 10_000, clock: Callable[[], float] = time.monotonic):
+        self.user_capacity = user_capacity
+        self.user_refill_per_second = user_refill_per_second
+        self.max_tracked_users = max_tracked_users
+        self.clock = clock
+        self._users: "OrderedDict[int, TokenBucket]" = OrderedDict()
+        # Глобальний бюджет рендерів (спільний для всіх користувачів)
+        self.render_bucket = TokenBucket(render_burst, render_budget_per_minute / 60.0, clock)
+        self.rejected = 0
+
+    def _user_bucket(self, user_id: int) -> TokenBucket:
+        bucket = self._users.get(user_id)
+        if bucket is None:
+            bucket = TokenBucket(self.user_capacity, self.user_refill_per_second, self.clock)
+            self._users[user_id] = bucket
+            self._evict()
+        self._users.move_to_end(user_id)
+        return bucket
+
+    def _evict(self) -> None:
+        # Найдовше неактивні користувачі вже мають повний bucket — їх можна забути
+        while len(self._users) > self.max_tracked_users:
+            self._users.popitem(last=False)
+
+    def admit(self, user_id: int, cost: float) -> float:
+        """Повертає 0, якщо запит допущено (токени списано), або час очікування в секундах."""
+        bucket = self._user_bucket(user_id)
+        wait = bucket.wait_time(cost)
+        if wait > 0:
+            self.rejected += 1
+            return wait
+
+        bucket.consume(cost)
+        return 0.0
+
+    def admit_render(self) -> float:
+        """Глобальний бюджет: 0, якщо новий рендер можна запустити (токен списано), або час очікування."""
+        wait = self.render_bucket.wait_time(1)
+        if wait > 0:
+            self.rejected += 1
+            return wait
+
+        self.render_bucket.consume(1)
+        return 0.0
+
+    def should_notify(self, user_id: int, wait: float) -> bool:
+        """Одне повідомлення "спробуйте пізніше" на період очікування, а не на кожен запит."""
+        bucket = self._user_bucket(user_id)
+        now = self.clock()
+        if now < bucket.notified_until:
+            return False
+        bucket.notified_until = now + wait
+        return True
+
+
+admission = AdmissionController(
+    user_capacity=config.ADMISSION_USER_CAPACITY,
+    user_refill_per_second=config.ADMISSION_USER_REFILL_PER_SECOND,
+    render_budget_per_minute=config.ADMISSION_RENDER_BUDGET_PER_MINUTE,
+    render_burst=config.ADMISSION_RENDER_BURST,
+)
+
+
+def guard(handler: Callable, cost: float = COST_COMMAND,
+          controller: Optional[AdmissionController] = None) -> Callable:
+    """Обгортає обробник: при перевищенні ліміту відповідає "спробуйте через N с"."""
+    @functools.wraps(handler)
+    async def guarded(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        user = update.effective_user
+        current = controller or admission
+        if user is not None:
+            wait = current.admit(user.id, cost)
+            if wait > 0:
+                if not current.should_notify(user.id, wait):
+                    return
+                await context.bot.send_message(
+                    chat_id=update.effective_chat.id,
+                    text=f"Забагато запитів. Спробуйте ще раз через {math.ceil(wait)} с.",
+                )
+                return
+        await handler(update, context)
+
+    return guarded
@@ -1,80 +1,65 @@
+import asyncio
+import math
 from telegram import Update, ReplyKeyboardRemove
 from telegram.ext import ContextTypes
+from app.core import config
 from app.core.database import get_db
 from app.logic import session_manager
-from app.pdf_generator.generator import generate_pdf_from_data
+from app.pdf_generator.generator import render_pdf
+from app.pdf_generator.cache import ContentCache
+from app.pdf_generator.exporters import EXPORT_FORMATS, export_resume
+from app.pdf_generator import images
+from app.pdf_generator.jobs import RenderQueue
+from app.pdf_generator.workers import RenderWorkerPool
+from app.bot.admission import admission
+from app.bot.tenants import get_tenant, get_template, render_key, tenant_name
+from app.logic import dialog
 from app.logic.session_manager import (
-    STEP_START, STEP_WAITING_NAME, STEP_WAITING_CONTACTS,
-    STEP_WAITING_SUMMARY, STEP_IDLE,
-    STEP_WAITING_EXP_COMPANY, STEP_WAITING_EXP_POSITION,
-    STEP_WAITING_EXP_PERIOD, STEP_WAITING_EXP_DESC,
-    STEP_WAITING_EDU_INSTITUTION, STEP_WAITING_EDU_DEGREE, STEP_WAITING_EDU_YEAR,
-    STEP_WAITING_SKILL, # Навички
+    STEP_START, STEP_WAITING_NAME, STEP_IDLE, STEP_WAITING_PHOTO,
     transform_session_to_resume_data,
-    add_experience_item, add_education_item, add_skill_item
 )
 
-# --- СЛОВНИК КРОКІВ ---
-DIALOG_STEPS = {
-    STEP_START: {
-        "prompt": "Привіт! Я бот для створення резюме. Введіть ваше повне ім'я (ПІБ):",
-        "next_step": STEP_WAITING_NAME
-    },
-    STEP_WAITING_NAME: {
-        "prompt": "Введіть ваше повне ім'я (ПІБ):", 
-        "next_step": STEP_WAITING_CONTACTS
-    },
-    STEP_WAITING_CONTACTS: {
-        "prompt": "Чудово! Тепер введіть вашу електронну пошту та телефон (email, телефон):",
-        "next_step": STEP_WAITING_SUMMARY
-    },
-    STEP_WAITING_SUMMARY: {
-        "prompt": "Опишіть ваше професійне резюме (summary) одним абзацом:",
-        "next_step": STEP_IDLE
-    },
-    STEP_IDLE: {
-        "prompt": "Дані збережено! Доступні команди: /add_experience, /add_education, /add_skill, /generate.",
-        "next_step": STEP_IDLE
-    },
-    # Досвід
-    STEP_WAITING_EXP_COMPANY: {
-        "prompt": "Введіть назву компанії:",
-        "next_step": STEP_WAITING_EXP_POSITION
-    },
-    STEP_WAITING_EXP_POSITION: {
-        "prompt": "Введіть вашу посаду:",
-        "next_step": STEP_WAITING_EXP_PERIOD
-    },
-    STEP_WAITING_EXP_PERIOD: {
-        "prompt": "Введіть період роботи (наприклад: '2021-2023'):",
-        "next_step": STEP_WAITING_EXP_DESC
-    },
-    STEP_WAITING_EXP_DESC: {
-        "prompt": "Опишіть ваші обов'язки:",
-        "next_step": STEP_IDLE 
-    },
-    # Освіта
-    STEP_WAITING_EDU_INSTITUTION: {
-        "prompt": "Введіть назву навчального закладу:",
-        "next_step": STEP_WAITING_EDU_DEGREE
-    },
-    STEP_WAITING_EDU_DEGREE: {
-        "prompt": "Введіть спеціальність/ступінь:",
-        "next_step": STEP_WAITING_EDU_YEAR
-    },
-    STEP_WAITING_EDU_YEAR: {
-        "prompt": "Введіть рік закінчення:",
-        "next_step": STEP_IDLE
-    },
-    # Навички
-    STEP_WAITING_SKILL: {
-        "prompt": "Введіть одну навичку або мову (наприклад: 'Python' або 'English B2'):",
-        "next_step": STEP_IDLE
-    }
-}
+
+# Спільна черга рендеру: одна задача на користувача, обмежена кількість одночасних рендерів
+# Рендер іде в окремих процесах з лімітами часу і пам'яті
+# У режимі кількох ботів (tenants.py) черга, пул процесів і кеш спільні для всіх
+# render_pdf повертає PDFResult: розмір і профіль документа записуються в render_metrics
+render_queue = RenderQueue(
+    render_pdf,
+    max_workers=config.RENDER_WORKERS,
+    cache=ContentCache(config.PDF_CACHE_SIZE),
+    pool=RenderWorkerPool(
+        size=config.RENDER_WORKERS,
+        timeout=config.RENDER_TIMEOUT,
+        memory_limit_mb=config.RENDER_MEMORY_LIMIT_MB,
+        max_tasks_per_child=config.RENDER_MAX_TASKS_PER_CHILD,
+    ),
+    speculative_delay=config.SPECULATIVE_DEBOUNCE_SECONDS if config.SPECULATIVE_RENDERING else None,
+)
+
+# Фото обробляються у власному невеликому пулі: вони не обходять облік черги рендеру
+# і не забирають слот, що завжди лишається вільним для /generate
+photo_pool = RenderWorkerPool(
+    size=config.PHOTO_WORKERS,
+    timeout=config.RENDER_TIMEOUT,
+    memory_limit_mb=config.RENDER_MEMORY_LIMIT_MB,
+    warmup_modules=("PIL.Image",),
+)
+
+
+def schedule_speculative_render(context: ContextTypes.DEFAULT_TYPE, user_id: int, db_session) -> None:
+    """Після завершення секції готуємо PDF у фоні, щоб /generate відповів з кешу."""
+    if render_queue.speculative_delay is None:
+        return
+    try:
+        render_queue.speculate(render_key(context, user_id), transform_session_to_resume_data(db_session),
+                               get_template(context))
+    except ValueError:
+        pass  # Невалідні дані: /generate покаже помилку сам
+
 
 def get_next_prompt(current_step):
-    return DIALOG_STEPS.get(current_step, DIALOG_STEPS[STEP_IDLE])["prompt"]
+    return dialog.get_prompt(current_step)
 
 
 # --- КОМАНДИ ---
@@ -85,73 +70,196 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
     db = get_db()
     try:
         telegram_data = {"first_name": user.first_name, "last_name": user.last_name, "username": user.username}
-        db_user = session_manager.get_or_create_user(db, user.id, telegram_data)
+        db_user = session_manager.get_or_create_user(db, user.id, telegram_data, tenant_name(context))
         session_manager.update_session_context(db, db_user.id, {}, next_step=STEP_WAITING_NAME)
     finally:
         db.close()
-    await bot.send_message(chat_id=update.effective_chat.id, text=f"Ласкаво просимо! {get_next_prompt(STEP_START)}")
+    tenant = get_tenant(context)
+    welcome = tenant.welcome if tenant and tenant.welcome else "Ласкаво просимо!"
+    await bot.send_message(chat_id=update.effective_chat.id, text=f"{welcome} {get_next_prompt(STEP_START)}")
 
 
-async def add_experience_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    user_id = update.effective_user.id
-    bot = context.bot
-    db = get_db()
-    try:
-        db_user = session_manager.get_or_create_user(db, user_id, {})
-        initial_data = {"temp_experience": {}} 
-        session_manager.update_session_context(db, db_user.id, initial_data, next_step=STEP_WAITING_EXP_COMPANY)
-        await bot.send_message(chat_id=update.effective_chat.id, text="Додавання роботи. " + get_next_prompt(STEP_WAITING_EXP_COMPANY))
-    finally:
-        db.close()
+def make_add_section_command(section_name: str):
+    """Створює обробник /add_<секція> для секції з dialog.SECTIONS."""
+    async def add_section_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        user_id = update.effective_user.id
+        bot = context.bot
+        db = get_db()
+        try:
+            db_user = session_manager.get_or_create_user(db, user_id, {}, tenant_name(context))
+            db_session = session_manager.get_session_by_user(db, db_user.id)
+            transition = dialog.begin_section(db_session.context, section_name)
+            session_manager.save_session_state(db, db_session, transition.context, next_step=transition.next_step)
+            await bot.send_message(chat_id=update.effective_chat.id, text=transition.reply)
+        finally:
+            db.close()
+
+    add_section_command.__name__ = f"{dialog.SECTIONS[section_name].command}_command"
+    return add_section_command
+
+
+# Команда -> обробник для всіх секцій з dialog.SECTIONS (реєструється у run_bot.py)
+SECTION_COMMANDS = {
+    section.command: make_add_section_command(name)
+    for name, section in dialog.SECTIONS.items()
+}
+
+add_experience_command = SECTION_COMMANDS["add_experience"]
+add_education_command = SECTION_COMMANDS["add_education"]
+add_skill_command = SECTION_COMMANDS["add_skill"]
 
 
-async def add_education_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+async def add_photo_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     user_id = update.effective_user.id
     bot = context.bot
     db = get_db()
     try:
-        db_user = session_manager.get_or_create_user(db, user_id, {})
-        initial_data = {"temp_education": {}}
-        session_manager.update_session_context(db, db_user.id, initial_data, next_step=STEP_WAITING_EDU_INSTITUTION)
-        await bot.send_message(chat_id=update.effective_chat.id, text="Додавання освіти. " + get_next_prompt(STEP_WAITING_EDU_INSTITUTION))
+        db_user = session_manager.get_or_create_user(db, user_id, {}, tenant_name(context))
+        session_manager.update_session_context(db, db_user.id, {}, next_step=STEP_WAITING_PHOTO)
+        await bot.send_message(chat_id=update.effective_chat.id, text=get_next_prompt(STEP_WAITING_PHOTO))
     finally:
         db.close()
 
 
-async def add_skill_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+async def photo_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     user_id = update.effective_user.id
+    chat_id = update.effective_chat.id
     bot = context.bot
     db = get_db()
     try:
-        db_user = session_manager.get_or_create_user(db, user_id, {})
-        session_manager.update_session_context(db, db_user.id, {}, next_step=STEP_WAITING_SKILL)
-        await bot.send_message(chat_id=update.effective_chat.id, text="Додавання навички. " + get_next_prompt(STEP_WAITING_SKILL))
+        db_user = session_manager.get_or_create_user(db, user_id, {}, tenant_name(context))
+        db_session = session_manager.get_session_by_user(db, db_user.id)
+        if db_session.current_step != STEP_WAITING_PHOTO:
+            await bot.send_message(chat_id=chat_id, text="Щоб додати фото до резюме, використайте /add_photo.")
+            return
+
+        photo = images.pick_photo_size(update.message.photo)
+        if photo.file_size and photo.file_size > config.PHOTO_MAX_DOWNLOAD_BYTES:
+            await bot.send_message(chat_id=chat_id, text="Фото завелике, надішліть менше.")
+            return
+
+        # Те саме фото (file_unique_id) обробляється лише один раз
+        if not images.has_derivative(photo.file_unique_id):
+            tg_file = await bot.get_file(photo.file_id)
+            raw = bytes(await tg_file.download_as_bytearray())
+            # Декодування і ресайз — у пулі процесів, не в циклі подій
+            derivative = await photo_pool.run(images.process_photo, raw)
+            images.save_derivative(photo.file_unique_id, derivative)
+
+        new_context = dict(db_session.context or {})
+        new_context["personal"] = {**new_context.get("personal", {}), "photo_id": photo.file_unique_id}
+        session_manager.save_session_state(db, db_session, new_context, next_step=STEP_IDLE)
+        render_queue.cancel(render_key(context, user_id))
+        schedule_speculative_render(context, user_id, db_session)
+        await bot.send_message(chat_id=chat_id, text="✅ Фото збережено!")
+    except Exception as e:
+        print(f"Error photo: {e}")
+        await bot.send_message(chat_id=chat_id, text=f"Помилка: {e}")
     finally:
         db.close()
 
 
 async def generate_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     user_id = update.effective_user.id
+    chat_id = update.effective_chat.id
     bot = context.bot
-    await bot.send_message(chat_id=update.effective_chat.id, text="Генерую PDF...")
     db = get_db()
     try:
-        db_user = session_manager.get_or_create_user(db, user_id, {})
+        db_user = session_manager.get_or_create_user(db, user_id, {}, tenant_name(context))
         db_session = session_manager.get_session_by_user(db, db_user.id)
         resume_data = transform_session_to_resume_data(db_session)
-        pdf_bytes = generate_pdf_from_data(resume_data)
+        first_name = db_user.first_name
+        internal_user_id = db_user.id
+    except Exception as e:
+        print(f"Error PDF: {e}")
+        await bot.send_message(chat_id=chat_id, text=f"Помилка: {e}")
+        return
+    finally:
+        db.close()
+
+    key, template = render_key(context, user_id), get_template(context)
+    if render_queue.needs_render(key, resume_data, template):
+        # Глобальний бюджет рендерів — лише за новий рендер, не за повтор чи кеш
+        wait = admission.admit_render()
+        if wait > 0:
+            await bot.send_message(chat_id=chat_id,
+                                   text=f"Сервер зайнятий. Спробуйте ще раз через {math.ceil(wait)} с.")
+            return
+
+    job, attached = render_queue.submit(key, resume_data, template)
+    position = render_queue.position(job)
+
+    if attached:
+        # Документ надішле перший запит, цей лише повідомляє статус
+        status = "PDF уже генерується, зачекайте."
+        if position:
+            status += f" Місце в черзі: {position}."
+        await bot.send_message(chat_id=chat_id, text=status)
+        return
+
+    if not job.future.done():
+        status = "Генерую PDF..."
+        if position:
+            status += f" Місце в черзі: {position}."
+        await bot.send_message(chat_id=chat_id, text=status)
+
+    try:
+        pdf_bytes = await job.wait()
         await bot.send_document(
-            chat_id=update.effective_chat.id,
+            chat_id=chat_id,
             document=pdf_bytes,
-            filename=f"CV_{db_user.first_name}.pdf",
+            filename=f"CV_{first_name}.pdf",
             caption="Ось ваше резюме!",
             reply_markup=ReplyKeyboardRemove(),
         )
+        if job.metrics is not None:
+            # Лише свіжий рендер (не відповідь з кешу)
+            db = get_db()
+            try:
+                session_manager.save_render_metrics(db, internal_user_id, job.metrics.profile,
+                                                    job.metrics.size_bytes, job.metrics.render_seconds)
+            finally:
+                db.close()
+    except asyncio.CancelledError:
+        if not job.cancelled:
+            raise
+        await bot.send_message(chat_id=chat_id, text="Дані змінилися під час генерації. Натисніть /generate ще раз.")
     except Exception as e:
         print(f"Error PDF: {e}")
-        await bot.send_message(chat_id=update.effective_chat.id, text=f"Помилка: {e}")
-    finally:
-        db.close()
+        await bot.send_message(chat_id=chat_id, text=f"Помилка: {e}")
+
+
+def make_export_command(fmt: str):
+    """Створює обробник /export_<формат>: HTML/Markdown/текст без верстки PDF."""
+    async def export_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        user_id = update.effective_user.id
+        bot = context.bot
+        db = get_db()
+        try:
+            db_user = session_manager.get_or_create_user(db, user_id, {}, tenant_name(context))
+            db_session = session_manager.get_session_by_user(db, db_user.id)
+            resume_data = transform_session_to_resume_data(db_session)
+            # Кеш за хешем вмісту спільний з PDF
+            document = export_resume(resume_data, fmt, cache=render_queue.cache, template=get_template(context))
+            _, extension = EXPORT_FORMATS[fmt]
+            await bot.send_document(
+                chat_id=update.effective_chat.id,
+                document=document,
+                filename=f"CV_{db_user.first_name}.{extension}",
+                caption="Ось ваше резюме!",
+            )
+        except Exception as e:
+            print(f"Error export: {e}")
+            await bot.send_message(chat_id=update.effective_chat.id, text=f"Помилка: {e}")
+        finally:
+            db.close()
+
+    export_command.__name__ = f"export_{fmt}_command"
+    return export_command
+
+
+# /export_html, /export_md, /export_txt
+EXPORT_COMMANDS = {f"export_{fmt}": make_export_command(fmt) for fmt in EXPORT_FORMATS}
 
 
 async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -161,64 +269,23 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     db = get_db()
     
     try:
-        db_user = session_manager.get_or_create_user(db, user_id, {})
+        db_user = session_manager.get_or_create_user(db, user_id, {}, tenant_name(context))
         db_session = session_manager.get_session_by_user(db, db_user.id)
         current_step = db_session.current_step
 
         if current_step == STEP_IDLE:
-            await bot.send_message(chat_id=update.effective_chat.id, text="Використовуйте меню команд (/add...).")
-            return
-
-        dialog_info = DIALOG_STEPS.get(current_step)
-        next_step = dialog_info["next_step"] if dialog_info else STEP_IDLE
-        
-        # --- ФІНАЛІЗАЦІЯ ДОСВІДУ ---
-        if current_step == STEP_WAITING_EXP_DESC:
-            new_data = {"temp_experience": {"description": text}}
-            session_manager.update_session_context(db, db_user.id, new_data, next_step=STEP_IDLE)
-            session_manager.add_experience_item(db, user_id)
-            await bot.send_message(chat_id=update.effective_chat.id, text="✅ Досвід роботи збережено!")
-            return
-
-        # --- ФІНАЛІЗАЦІЯ ОСВІТИ ---
-        if current_step == STEP_WAITING_EDU_YEAR:
-            new_data = {"temp_education": {"year": text}}
-            session_manager.update_session_context(db, db_user.id, new_data, next_step=STEP_IDLE)
-            session_manager.add_education_item(db, user_id)
-            await bot.send_message(chat_id=update.effective_chat.id, text="✅ Освіту збережено!")
-            return
-
-        # --- ФІНАЛІЗАЦІЯ НАВИЧКИ ---
-        if current_step == STEP_WAITING_SKILL:
-            session_manager.add_skill_item(db, user_id, text)
-            await bot.send_message(chat_id=update.effective_chat.id, text=f"✅ Навичку '{text}' додано!")
+            await bot.send_message(chat_id=update.effective_chat.id, text=dialog.IDLE_REPLY)
             return
 
-        # --- ІНШІ КРОКИ ---
-        new_context_data = {}
-        
-        if current_step == STEP_WAITING_NAME:
-            new_context_data = {"personal": {"full_name": text}}
-        elif current_step == STEP_WAITING_CONTACTS:
-            parts = [p.strip() for p in text.split(',')]
-            email = parts[0] if len(parts) > 0 else ""
-            phone = parts[1] if len(parts) > 1 else ""
-            new_context_data = {"personal": {"email": email, "phone": phone}}
-        elif current_step == STEP_WAITING_SUMMARY:
-            new_context_data = {"personal": {"summary": text}}
-        elif current_step == STEP_WAITING_EXP_COMPANY:
-            new_context_data = {"temp_experience": {"company": text}}
-        elif current_step == STEP_WAITING_EXP_POSITION:
-            new_context_data = {"temp_experience": {"position": text}}
-        elif current_step == STEP_WAITING_EXP_PERIOD:
-             new_context_data = {"temp_experience": {"period": text}}
-        elif current_step == STEP_WAITING_EDU_INSTITUTION:
-            new_context_data = {"temp_education": {"institution": text}}
-        elif current_step == STEP_WAITING_EDU_DEGREE:
-            new_context_data = {"temp_education": {"degree": text}}
-
-        session_manager.update_session_context(db, db_user.id, new_context_data, next_step=next_step)
-        await bot.send_message(chat_id=update.effective_chat.id, text=get_next_prompt(next_step))
+        # Один перехід = один атомарний запис контексту і кроку
+        transition = dialog.advance(db_session.context, current_step, text)
+        session_manager.save_session_state(db, db_session, transition.context, next_step=transition.next_step)
+        # Дані змінилися — рендер зі старими даними більше не потрібен
+        render_queue.cancel(render_key(context, user_id))
+        if transition.next_step == STEP_IDLE:
+            # Секцію (або summary) завершено — ймовірно, далі буде /generate
+            schedule_speculative_render(context, user_id, db_session)
+        await bot.send_message(chat_id=update.effective_chat.id, text=transition.reply)
             
     finally:
         db.close()
@@ -0,0 +1,178 @@
+"""Кілька брендованих ботів (орендарів) в одному процесі.
+
+Кожен орендар — окремий telegram.ext.Application зі своїм токеном, обробниками та
+шаблоном резюме (з таблиці templates за name/language або файл з templates/).
+Спільні на весь процес: пул процесів рендеру і кеш (handlers.render_queue), пул
+з'єднань БД (database.engine) і контроль допуску, тож кожен наступний бот коштує
+лише об'єкт Application, а не окремий процес з WeasyPrint.
+
+Дані користувачів спільні: та сама людина в різних ботах бачить те саме резюме,
+а бот визначає лише оформлення. Боти, яким писав користувач, записуються в
+user_tenants — розсилка (app/admin/broadcast.py --tenant) іде лише їхнім користувачам. Задачі рендеру ключуються парою (бот, користувач),
+тож /generate або редагування в одному боті не скасовує рендер в іншому.
+
+Шаблон з БД отримує змінні data (ResumeData.model_dump()), photo (data: URI або None)
+і css (Template.css). Посекційна верстка великих резюме для шаблонів з БД вимкнена:
+вона потребує підтримки body_only/continued, як у templates/resume_template.html.
+
+Конфігурація (JSON, шлях у змінній TENANTS_CONFIG):
+    {"tenants": [
+        {"name": "main", "token_env": "TELEGRAM_BOT_TOKEN"},
+        {"name": "it_cv", "token_env": "IT_CV_BOT_TOKEN", "template": "it_modern",
+         "language": "en", "welcome": "Welcome to IT CV!"}
+    ]}
+"""
+import asyncio
+import dataclasses
+import json
+import os
+import signal
+from dataclasses import dataclass, field
+from typing import Callable, Hashable, List, Optional
+
+from sqlalchemy.orm import Session as DBSession
+from telegram.ext import Application, ContextTypes
+
+from app.models.orm import Template
+from app.pdf_generator.templating import TEMPLATE_DIR, TemplateSource
+
+# Ключ у Application.bot_data, за яким обробники знаходять свого орендаря
+TENANT_KEY = "tenant"
+
+
+@dataclass(frozen=True)
+class Tenant:
+    name: str
+    token: str = field(repr=False)
+    template_name: Optional[str] = None
+    language: Optional[str] = None
+    welcome: Optional[str] = None
+    # Заповнюється resolve_templates(); None — стандартний шаблон
+    template: Optional[TemplateSource] = None
+
+
+def load_tenants(path: str) -> List[Tenant]:
+    """Читає конфігурацію орендарів. Токени — напряму ("token") або зі змінної ("token_env")."""
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f).get("tenants", [])
+    if not entries:
+        raise ValueError(f"У {path} не описано жодного бота")
+
+    tenants = []
+    for entry in entries:
+        name = entry.get("name")
+        if not name:
+            raise ValueError("Кожен бот у конфігурації повинен мати name")
+        token = entry.get("token") or os.getenv(entry.get("token_env", ""))
+        if not token:
+            raise ValueError(f"Бот {name}: токен не знайдено (token або token_env)")
+        tenants.append(Tenant(name=name, token=token, template_name=entry.get("template"),
+                              language=entry.get("language"), welcome=entry.get("welcome")))
+
+    names = [tenant.name for tenant in tenants]
+    if len(set(names)) != len(names):
+        raise ValueError("Імена ботів у конфігурації повторюються")
+    if len({tenant.token for tenant in tenants}) != len(tenants):
+        raise ValueError("Той самий токен указано для кількох ботів")
+    return tenants
+
+
+def find_template(db: DBSession, name: Optional[str] = None,
+                  language: Optional[str] = None) -> Optional[TemplateSource]:
+    """Активний шаблон з БД за назвою та/або мовою; інакше файл з templates/ з тією ж назвою."""
+    if not name and not language:
+        return None
+
+    query = db.query(Template).filter(Template.is_active.is_(True))
+    if name:
+        query = query.filter(Template.name == name)
+    if language:
+        query = query.filter(Template.language == language)
+    row = query.order_by(Template.id).first()
+    if row is not None:
+        return TemplateSource(name=row.name, html=row.html, css=row.css)
+
+    if name and os.path.isfile(os.path.join(TEMPLATE_DIR, name)):
+        return TemplateSource(name=name)
+
+    print(f"Шаблон не знайдено (name={name}, language={language}), використовується стандартний")
+    return None
+
+
+def resolve_templates(db: DBSession, tenants: List[Tenant]) -> List[Tenant]:
+    """Шаблони читаються один раз при старті, а не на кожен /generate."""
+    return [dataclasses.replace(tenant, template=find_template(db, tenant.template_name, tenant.language))
+            for tenant in tenants]
+
+
+def get_tenant(context: ContextTypes.DEFAULT_TYPE) -> Optional[Tenant]:
+    """Орендар бота, що отримав оновлення (None — звичайний режим з одним ботом)."""
+    return context.bot_data.get(TENANT_KEY)
+
+
+def tenant_name(context: ContextTypes.DEFAULT_TYPE) -> Optional[str]:
+    """Ім'я бота для user_tenants (None — режим одного бота)."""
+    tenant = get_tenant(context)
+    return tenant.name if tenant else None
+
+
+def get_template(context: ContextTypes.DEFAULT_TYPE) -> Optional[TemplateSource]:
+    tenant = get_tenant(context)
+    return tenant.template if tenant else None
+
+
+def render_key(context: ContextTypes.DEFAULT_TYPE, user_id: int) -> Hashable:
+    """Ключ задачі у спільній черзі рендеру: боти не скасовують задачі один одного."""
+    tenant = get_tenant(context)
+    return (tenant.name, user_id) if tenant else user_id
+
+
+def build_application(tenant: Tenant, register_handlers: Callable[[Application], None]) -> Application:
+    application = Application.builder().token(tenant.token).build()
+    application.bot_data[TENANT_KEY] = tenant
+    register_handlers(application)
+    return application
+
+
+async def run_tenants(applications: List[Application], poll_interval: float = 3.0) -> None:
+    """Запускає polling для всіх ботів в одному циклі подій і чекає на SIGINT/SIGTERM."""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            pass  # Windows: зупинка через KeyboardInterrupt
+
+    started = []
+    try:
+        for application in applications:
+            await application.initialize()
+            started.append(application)
+            await application.start()
+            await application.updater.start_polling(poll_interval=poll_interval, drop_pending_updates=True)
+            print(f"Бот {application.bot_data[TENANT_KEY].name} запущено")
+        await stop.wait()
+    finally:
+        for application in reversed(started):
+            if application.updater.running:
+                await application.updater.stop()
+            if application.running:
+                await application.stop()
+            await application.shutdown()
+
+
+def run_from_config(path: str, register_handlers: Callable[[Application], None]) -> None:
+    """Точка входу режиму кількох ботів (БЛОКУЮЧИЙ ВИКЛИК). БД має бути вже ініціалізована."""
+    from app.core.database import get_db
+
+    tenants = load_tenants(path)
+    db = get_db()
+    try:
+        tenants = resolve_templates(db, tenants)
+    finally:
+        db.close()
+
+    applications = [build_application(tenant, register_handlers) for tenant in tenants]
+    print(f"Запуск {len(applications)} Telegram-ботів в одному процесі...")
+    asyncio.run(run_tenants(applications))
@@ -0,0 +1,57 @@
+import os
+from dotenv import load_dotenv
+
+# Налаштування застосунку зі змінних середовища (.env)
+load_dotenv()
+
+# --- ГЕНЕРАЦІЯ PDF ---
+# Скільки PDF рендеряться одночасно (WeasyPrint навантажує CPU)
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "2"))
+# Ліміти одного рендеру: при перевищенні процес вбивається і перезапускається
+RENDER_TIMEOUT = float(os.getenv("RENDER_TIMEOUT", "20"))
+RENDER_MEMORY_LIMIT_MB = int(os.getenv("RENDER_MEMORY_LIMIT_MB", "512"))
+# Після скількох рендерів процес перезапускається (захист від накопичення пам'яті)
+RENDER_MAX_TASKS_PER_CHILD = int(os.getenv("RENDER_MAX_TASKS_PER_CHILD", "50"))
+# Скільки готових PDF тримати в кеші за хешем вмісту
+PDF_CACHE_SIZE = int(os.getenv("PDF_CACHE_SIZE", "128"))
+# Профіль PDF за замовчуванням: "auto", "standard" або "compact"
+PDF_PROFILE = os.getenv("PDF_PROFILE", "auto")
+# Бюджет розміру PDF у байтах: у режимі "auto" більший документ перегенеровується компактно
+PDF_SIZE_BUDGET = int(os.getenv("PDF_SIZE_BUDGET", str(300 * 1024)))
+# Посекційна верстка великих резюме: поріг висоти документа і висота однієї частини
+# в рядках верстки (chunking.py; сторінка A4 ~43 рядки, частина — з запасом на похибку
+# оцінки, бо переповнена частина дає зайву майже порожню сторінку;
+# калібрування перевіряє python -m benchmarks.bench_large_document)
+PDF_CHUNK_THRESHOLD = float(os.getenv("PDF_CHUNK_THRESHOLD", "86"))
+PDF_CHUNK_BUDGET = float(os.getenv("PDF_CHUNK_BUDGET", "42"))
+# Спекулятивний фоновий рендер після завершення секції (вимкнено за замовчуванням;
+# потребує RENDER_WORKERS >= 2 — один слот завжди лишається для /generate)
+SPECULATIVE_RENDERING = os.getenv("SPECULATIVE_RENDERING", "false").lower() in ("1", "true", "yes")
+# Пауза без редагувань перед фоновим рендером (с)
+SPECULATIVE_DEBOUNCE_SECONDS = float(os.getenv("SPECULATIVE_DEBOUNCE_SECONDS", "5"))
+
+# --- КОНТРОЛЬ ДОПУСКУ (rate limiting) ---
+# Token bucket користувача: запас токенів і швидкість поповнення (рендер коштує 10, текст 1)
+ADMISSION_USER_CAPACITY = float(os.getenv("ADMISSION_USER_CAPACITY", "20"))
+ADMISSION_USER_REFILL_PER_SECOND = float(os.getenv("ADMISSION_USER_REFILL_PER_SECOND", "0.5"))
+# Глобальний бюджет рендерів на всіх користувачів
+ADMISSION_RENDER_BUDGET_PER_MINUTE = float(os.getenv("ADMISSION_RENDER_BUDGET_PER_MINUTE", "30"))
+ADMISSION_RENDER_BURST = float(os.getenv("ADMISSION_RENDER_BURST", "5"))
+
+# --- ФОТО ПРОФІЛЮ ---
+# Каталог з обробленими фото (кеш за file_unique_id)
+PHOTO_CACHE_DIR = os.getenv("PHOTO_CACHE_DIR", "./photo_cache")
+# Максимальний розмір вихідного файлу з Telegram
+PHOTO_MAX_DOWNLOAD_BYTES = int(os.getenv("PHOTO_MAX_DOWNLOAD_BYTES", str(5 * 1024 * 1024)))
+# Окремі процеси для обробки фото (не займають слоти рендеру PDF)
+PHOTO_WORKERS = int(os.getenv("PHOTO_WORKERS", "1"))
+
+# --- РОЗСИЛКИ ---
+# Telegram дозволяє ~30 повідомлень/с на бота; лишаємо запас
+BROADCAST_RATE_PER_SECOND = float(os.getenv("BROADCAST_RATE_PER_SECOND", "25"))
+BROADCAST_CONCURRENCY = int(os.getenv("BROADCAST_CONCURRENCY", "10"))
+BROADCAST_BATCH_SIZE = int(os.getenv("BROADCAST_BATCH_SIZE", "500"))
+
+# --- КІЛЬКА БОТІВ В ОДНОМУ ПРОЦЕСІ ---
+# Шлях до JSON з описом ботів (app/bot/tenants.py); порожньо — один бот з TELEGRAM_BOT_TOKEN
+TENANTS_CONFIG = os.getenv("TENANTS_CONFIG", "")
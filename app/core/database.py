@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -21,10 +21,42 @@ def get_db():
     return SessionLocal()
 
 
+# Колонки, додані до вже існуючих таблиць: create_all їх не створює, тому
+# init_db додає відсутні через ALTER TABLE (таблиця -> колонка -> DDL)
+ADDED_COLUMNS = {
+    "users": {"is_blocked": "BOOLEAN NOT NULL DEFAULT FALSE"},
+    "broadcasts": {"tenant": "VARCHAR"},
+}
+
+
+def upgrade_schema(bind) -> None:
+    """Додає відсутні колонки з ADDED_COLUMNS (ідемпотентно)."""
+    inspector = inspect(bind)
+    with bind.begin() as connection:
+        for table, columns in ADDED_COLUMNS.items():
+            if not inspector.has_table(table):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table)}
+            for name, ddl in columns.items():
+                if name not in existing:
+                    print(f"Міграція: {table}.{name}")
+                    connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+
+
 def init_db():
     """Функція для створення таблиць у базі даних (викликається при запуску застосунку)."""
     # Це імпортує всі моделі ORM, щоб Base їх "знала"
-    from app.models.orm import User, Session, Resume, Template, PDFFile
+    from app.models.orm import User, Session, Resume, Template, PDFFile, RenderMetric, Broadcast, UserTenant
 
     # Створює всі таблиці, визначені через Base
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+
+    # Пошуковий індекс (FTS5 / tsvector) не описується через ORM
+    from app.logic.search import ensure_search_index
+    db = SessionLocal()
+    try:
+        ensure_search_index(db)
+        db.commit()
+    finally:
+        db.close()
\ No newline at end of file
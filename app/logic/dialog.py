@@ -0,0 +1,321 @@
+"""Декларативний рушій діалогу (State Machine).
+
+Кожен крок описує свій prompt, парсер введення, шлях у контексті сесії,
+наступний крок і (за потреби) фіналізатор. Секції резюме зі списками
+(досвід, освіта, навички, проєкти...) задаються даними у SECTIONS —
+кроки для них генеруються автоматично.
+
+Рушій не звертається до БД: `advance` повертає новий контекст і наступний
+крок, а обробник записує їх одним комітом (save_session_state).
+"""
+import copy
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.logic.session_manager import (
+    STEP_START, STEP_WAITING_NAME, STEP_WAITING_CONTACTS,
+    STEP_WAITING_SUMMARY, STEP_IDLE,
+    STEP_WAITING_EXP_COMPANY, STEP_WAITING_EXP_POSITION,
+    STEP_WAITING_EXP_PERIOD, STEP_WAITING_EXP_DESC,
+    STEP_WAITING_EDU_INSTITUTION, STEP_WAITING_EDU_DEGREE, STEP_WAITING_EDU_YEAR,
+    STEP_WAITING_SKILL,
+    STEP_WAITING_PROJECT_NAME, STEP_WAITING_PROJECT_DESC,
+    STEP_WAITING_LANGUAGE,
+    STEP_WAITING_CERT_NAME, STEP_WAITING_CERT_YEAR,
+    STEP_WAITING_PHOTO,
+    build_experience_item, build_education_item, append_section_item,
+)
+from app.models.schemas import MAX_SHORT_TEXT, MAX_LONG_TEXT, MAX_LIST_ITEMS, MAX_SKILLS
+
+IDLE_REPLY = "Використовуйте меню команд (/add...)."
+
+
+# --- ПАРСЕРИ ВВЕДЕННЯ ---
+
+def parse_text(text: str) -> str:
+    return text.strip()
+
+
+def parse_contacts(text: str) -> dict:
+    """'email, телефон' -> {"email": ..., "phone": ...}"""
+    parts = [p.strip() for p in text.split(',')]
+    email = parts[0] if len(parts) > 0 else ""
+    phone = parts[1] if len(parts) > 1 else ""
+    return {"email": email, "phone": phone}
+
+
+# --- ВАЛІДАТОРИ ВВЕДЕННЯ ---
+# validator(text) -> повідомлення про помилку або None, якщо введення коректне
+
+def min_length(limit: int) -> Callable[[str], Optional[str]]:
+    def validate(text: str) -> Optional[str]:
+        if len(text.strip()) < limit:
+            return f"Занадто короткий текст (мінімум символів: {limit}). Спробуйте ще раз."
+        return None
+    return validate
+
+
+# --- ОПИС КРОКІВ ТА СЕКЦІЙ ---
+
+@dataclass(frozen=True)
+class Step:
+    """Один крок діалогу."""
+    name: str
+    prompt: str
+    next_step: str
+    # Шлях у контексті, куди пишеться результат парсера. Якщо парсер повертає dict,
+    # а шлях вказує на секцію (напр. ("personal",)), поля зливаються.
+    path: Optional[Tuple[str, ...]] = None
+    parser: Callable[[str], Any] = parse_text
+    # finalizer(context) -> повідомлення для користувача; змінює context на місці
+    finalizer: Optional[Callable[[dict], str]] = None
+    # Довше введення відхиляється одразу, а не під час /generate
+    max_length: int = MAX_SHORT_TEXT
+    # False: крок чекає не текст (напр. фото), на текст повторюємо prompt
+    accepts_text: bool = True
+    # Некоректне введення відхиляється з повідомленням валідатора, крок не змінюється
+    validator: Optional[Callable[[str], Optional[str]]] = None
+
+
+@dataclass(frozen=True)
+class SectionField:
+    """Поле секції, яке запитується окремим кроком."""
+    step: str
+    key: str
+    prompt: str
+    parser: Callable[[str], Any] = parse_text
+    max_length: int = MAX_SHORT_TEXT
+    validator: Optional[Callable[[str], Optional[str]]] = None
+
+
+@dataclass(frozen=True)
+class Section:
+    """Секція резюме зі списком елементів (досвід, освіта, навички...)."""
+    name: str  # ключ у контексті та в ResumeData
+    command: str  # /add_<...>
+    intro: str
+    fields: Tuple[SectionField, ...]
+    build_item: Callable[[dict], Any]
+    done_message: str  # format(**temp) з полями секції
+    max_items: int = MAX_LIST_ITEMS
+
+    @property
+    def temp_key(self) -> str:
+        return f"temp_{self.name}"
+
+
+SECTIONS: Dict[str, Section] = {
+    "experience": Section(
+        name="experience",
+        command="add_experience",
+        intro="Додавання роботи. ",
+        fields=(
+            SectionField(STEP_WAITING_EXP_COMPANY, "company", "Введіть назву компанії:"),
+            SectionField(STEP_WAITING_EXP_POSITION, "position", "Введіть вашу посаду:"),
+            SectionField(STEP_WAITING_EXP_PERIOD, "period", "Введіть період роботи (наприклад: '2021-2023'):"),
+            SectionField(STEP_WAITING_EXP_DESC, "description", "Опишіть ваші обов'язки:",
+                         max_length=MAX_LONG_TEXT),
+        ),
+        build_item=build_experience_item,
+        done_message="✅ Досвід роботи збережено!",
+    ),
+    "education": Section(
+        name="education",
+        command="add_education",
+        intro="Додавання освіти. ",
+        fields=(
+            SectionField(STEP_WAITING_EDU_INSTITUTION, "institution", "Введіть назву навчального закладу:"),
+            SectionField(STEP_WAITING_EDU_DEGREE, "degree", "Введіть спеціальність/ступінь:"),
+            SectionField(STEP_WAITING_EDU_YEAR, "year", "Введіть рік закінчення:"),
+        ),
+        build_item=build_education_item,
+        done_message="✅ Освіту збережено!",
+    ),
+    "skills": Section(
+        name="skills",
+        command="add_skill",
+        intro="Додавання навички. ",
+        fields=(
+            SectionField(STEP_WAITING_SKILL, "name",
+                         "Введіть одну навичку або мову (наприклад: 'Python' або 'English B2'):"),
+        ),
+        build_item=lambda temp: temp.get("name"),
+        done_message="✅ Навичку '{name}' додано!",
+        max_items=MAX_SKILLS,
+    ),
+    "projects": Section(
+        name="projects",
+        command="add_project",
+        intro="Додавання проєкту. ",
+        fields=(
+            SectionField(STEP_WAITING_PROJECT_NAME, "name", "Введіть назву проєкту:"),
+            SectionField(STEP_WAITING_PROJECT_DESC, "description", "Коротко опишіть проєкт:",
+                         max_length=MAX_LONG_TEXT),
+        ),
+        build_item=lambda temp: {"name": temp.get("name"), "description": temp.get("description")},
+        done_message="✅ Проєкт '{name}' збережено!",
+    ),
+    "languages": Section(
+        name="languages",
+        command="add_language",
+        intro="Додавання мови. ",
+        fields=(
+            SectionField(STEP_WAITING_LANGUAGE, "name", "Введіть мову та рівень (наприклад: 'English B2'):"),
+        ),
+        build_item=lambda temp: temp.get("name"),
+        done_message="✅ Мову '{name}' додано!",
+        max_items=MAX_SKILLS,
+    ),
+    "certificates": Section(
+        name="certificates",
+        command="add_certificate",
+        intro="Додавання сертифіката. ",
+        fields=(
+            SectionField(STEP_WAITING_CERT_NAME, "name", "Введіть назву сертифіката:"),
+            SectionField(STEP_WAITING_CERT_YEAR, "year", "Введіть рік отримання:"),
+        ),
+        build_item=lambda temp: {"name": temp.get("name"), "year": temp.get("year")},
+        done_message="✅ Сертифікат '{name}' збережено!",
+    ),
+}
+
+
+def _make_section_finalizer(section: Section) -> Callable[[dict], str]:
+    def finalize(context: dict) -> str:
+        temp = dict(context.get(section.temp_key) or {})
+        append_section_item(context, section.temp_key, section.name, section.build_item)
+        return section.done_message.format(**temp)
+    return finalize
+
+
+def _build_steps() -> Dict[str, Step]:
+    steps = {
+        STEP_START: Step(
+            name=STEP_START,
+            prompt="Привіт! Я бот для створення резюме. Введіть ваше повне ім'я (ПІБ):",
+            next_step=STEP_WAITING_NAME,
+        ),
+        STEP_WAITING_NAME: Step(
+            name=STEP_WAITING_NAME,
+            prompt="Введіть ваше повне ім'я (ПІБ):",
+            next_step=STEP_WAITING_CONTACTS,
+            path=("personal", "full_name"),
+            # Як PersonalInfo.full_name: інакше помилка з'явилася б лише під час /generate
+            validator=min_length(2),
+        ),
+        STEP_WAITING_CONTACTS: Step(
+            name=STEP_WAITING_CONTACTS,
+            prompt="Чудово! Тепер введіть вашу електронну пошту та телефон (email, телефон):",
+            next_step=STEP_WAITING_SUMMARY,
+            path=("personal",),
+            parser=parse_contacts,
+        ),
+        STEP_WAITING_SUMMARY: Step(
+            name=STEP_WAITING_SUMMARY,
+            prompt="Опишіть ваше професійне резюме (summary) одним абзацом:",
+            next_step=STEP_IDLE,
+            path=("personal", "summary"),
+            max_length=MAX_LONG_TEXT,
+        ),
+        STEP_IDLE: Step(
+            name=STEP_IDLE,
+            prompt="Дані збережено! Доступні команди: "
+                   + ", ".join(f"/{s.command}" for s in SECTIONS.values()) + ", /add_photo, /generate.",
+            next_step=STEP_IDLE,
+        ),
+        STEP_WAITING_PHOTO: Step(
+            name=STEP_WAITING_PHOTO,
+            prompt="Надішліть фото профілю (як фото, не як файл):",
+            next_step=STEP_IDLE,
+            accepts_text=False,
+        ),
+    }
+
+    for section in SECTIONS.values():
+        for i, field in enumerate(section.fields):
+            is_last = i == len(section.fields) - 1
+            steps[field.step] = Step(
+                name=field.step,
+                prompt=field.prompt,
+                next_step=STEP_IDLE if is_last else section.fields[i + 1].step,
+                path=(section.temp_key, field.key),
+                parser=field.parser,
+                finalizer=_make_section_finalizer(section) if is_last else None,
+                max_length=field.max_length,
+                validator=field.validator,
+            )
+    return steps
+
+
+# Таблиця переходів: пошук кроку за O(1)
+STEPS: Dict[str, Step] = _build_steps()
+
+
+@dataclass
+class Transition:
+    """Результат одного кроку: новий контекст, наступний крок і відповідь користувачу."""
+    context: dict
+    next_step: str
+    reply: str
+
+
+def get_prompt(step_name: str) -> str:
+    return STEPS.get(step_name, STEPS[STEP_IDLE]).prompt
+
+
+def _write_path(context: dict, path: Tuple[str, ...], value: Any) -> None:
+    *parents, leaf = path
+    target = context
+    for key in parents:
+        if not isinstance(target.get(key), dict):
+            target[key] = {}
+        target = target[key]
+
+    if isinstance(value, dict) and isinstance(target.get(leaf), dict):
+        target[leaf].update(value)
+    else:
+        target[leaf] = value
+
+
+def advance(context: Optional[dict], step_name: str, text: str) -> Transition:
+    """Застосовує введення `text` до кроку `step_name`. Не змінює вхідний контекст."""
+    step = STEPS.get(step_name)
+    new_context = copy.deepcopy(context) if context else {}
+
+    if step is None or step.name == STEP_IDLE:
+        # Введення поза діалогом не очікується
+        return Transition(new_context, STEP_IDLE, IDLE_REPLY)
+
+    if not step.accepts_text:
+        return Transition(new_context, step.name, step.prompt)
+
+    if len(text) > step.max_length:
+        # Залишаємось на тому ж кроці
+        return Transition(new_context, step.name,
+                          f"Занадто довгий текст ({len(text)} символів, максимум {step.max_length}). Спробуйте коротше.")
+
+    error = step.validator(text) if step.validator else None
+    if error:
+        return Transition(new_context, step.name, error)
+
+    if step.path:
+        _write_path(new_context, step.path, step.parser(text))
+
+    if step.finalizer:
+        reply = step.finalizer(new_context)
+    else:
+        reply = get_prompt(step.next_step)
+
+    return Transition(new_context, step.next_step, reply)
+
+
+def begin_section(context: Optional[dict], section_name: str) -> Transition:
+    """Починає заповнення секції: очищує тимчасовий буфер і переходить до першого поля."""
+    section = SECTIONS[section_name]
+    new_context = copy.deepcopy(context) if context else {}
+    if len(new_context.get(section.name, [])) >= section.max_items:
+        return Transition(new_context, STEP_IDLE,
+                          f"Досягнуто ліміту: не більше {section.max_items} записів у цьому розділі.")
+    new_context[section.temp_key] = {}
+    first_step = section.fields[0].step
+    return Transition(new_context, first_step, section.intro + get_prompt(first_step))
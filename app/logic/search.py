@@ -0,0 +1,214 @@
+"""Повнотекстовий пошук по навичках і досвіду користувачів.
+
+Індекс зберігає один документ на користувача (ПІБ, навички, посади/компанії, описи)
+і оновлюється в тій самій транзакції, що й контекст сесії (save_session_state).
+
+- SQLite: віртуальна таблиця FTS5, ранжування bm25.
+- PostgreSQL: таблиця з tsvector + GIN-індекси, ранжування ts_rank_cd.
+Інші СУБД: індексація вимикається (пошук повертає порожній результат).
+
+CLI:
+    python -m app.logic.search rebuild
+    python -m app.logic.search query "python django" --skill python
+"""
+import argparse
+import re
+import weakref
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session as DBSession
+
+from app.models.orm import Session
+
+INDEX_TABLE = "resume_search"
+
+# Ваги полів: навички важливіші за посади, посади — за описи
+WEIGHT_SKILLS = 10.0
+WEIGHT_ROLES = 5.0
+WEIGHT_CONTENT = 1.0
+
+_DDL = {
+    "sqlite": [
+        # rowid = users.id: оновлення документа — пошук за rowid, без повного перегляду
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {INDEX_TABLE} USING fts5("
+        "full_name, skills, roles, content, tokenize='unicode61 remove_diacritics 2')",
+    ],
+    "postgresql": [
+        f"CREATE TABLE IF NOT EXISTS {INDEX_TABLE} ("
+        "user_id INTEGER PRIMARY KEY REFERENCES users(id), "
+        "full_name TEXT, skills TEXT, roles TEXT, content TEXT, "
+        "skills_vector TSVECTOR, document TSVECTOR)",
+        f"CREATE INDEX IF NOT EXISTS ix_{INDEX_TABLE}_document ON {INDEX_TABLE} USING GIN (document)",
+        f"CREATE INDEX IF NOT EXISTS ix_{INDEX_TABLE}_skills ON {INDEX_TABLE} USING GIN (skills_vector)",
+    ],
+}
+
+# Двигуни, для яких таблицю індексу вже створено
+_ready_engines = weakref.WeakSet()
+
+
+@dataclass
+class SearchDocument:
+    full_name: str
+    skills: str
+    roles: str
+    content: str
+
+
+@dataclass
+class SearchHit:
+    user_id: int
+    full_name: str
+    score: float
+
+
+def build_search_document(context: Optional[dict]) -> SearchDocument:
+    """Текст для індексу з контексту сесії."""
+    context = context or {}
+    experience = context.get("experience", [])
+    return SearchDocument(
+        full_name=(context.get("personal") or {}).get("full_name") or "",
+        skills=" ".join(filter(None, context.get("skills", []) + context.get("languages", []))),
+        roles=" ".join(filter(None, (f"{job.get('job_title') or ''} {job.get('company') or ''}"
+                                     for job in experience))),
+        content=" ".join(filter(None, (d for job in experience for d in (job.get("description") or [])))),
+    )
+
+
+def _dialect(db: DBSession) -> str:
+    return db.get_bind().dialect.name
+
+
+def ensure_search_index(db: DBSession) -> bool:
+    """Створює таблицю індексу в поточній транзакції (ідемпотентно). False — СУБД не підтримується."""
+    bind = db.get_bind()
+    statements = _DDL.get(bind.dialect.name)
+    if statements is None:
+        return False
+    if bind not in _ready_engines:
+        for statement in statements:
+            db.execute(text(statement))
+        _ready_engines.add(bind)
+    return True
+
+
+def index_document(db: DBSession, user_id: int, document: SearchDocument) -> None:
+    """Оновлює документ користувача в індексі. Коміт робить код, що викликає."""
+    dialect = _dialect(db)
+    if not ensure_search_index(db):
+        return
+    params = {"user_id": user_id, **document.__dict__}
+
+    if dialect == "sqlite":
+        db.execute(text(f"DELETE FROM {INDEX_TABLE} WHERE rowid = :user_id"), params)
+        db.execute(text(
+            f"INSERT INTO {INDEX_TABLE} (rowid, full_name, skills, roles, content) "
+            "VALUES (:user_id, :full_name, :skills, :roles, :content)"), params)
+    else:
+        db.execute(text(
+            f"INSERT INTO {INDEX_TABLE} (user_id, full_name, skills, roles, content, skills_vector, document) "
+            "VALUES (:user_id, :full_name, :skills, :roles, :content, to_tsvector('simple', :skills), "
+            "setweight(to_tsvector('simple', :skills), 'A') || setweight(to_tsvector('simple', :roles), 'B') "
+            "|| setweight(to_tsvector('simple', :content), 'C') || setweight(to_tsvector('simple', :full_name), 'D')) "
+            "ON CONFLICT (user_id) DO UPDATE SET full_name = EXCLUDED.full_name, skills = EXCLUDED.skills, "
+            "roles = EXCLUDED.roles, content = EXCLUDED.content, "
+            "skills_vector = EXCLUDED.skills_vector, document = EXCLUDED.document"), params)
+
+
+def index_session_context(db: DBSession, user_id: int, old_context: Optional[dict], new_context: Optional[dict]) -> None:
+    """Інкрементальне оновлення: переіндексуємо лише якщо змінився текст для пошуку."""
+    document = build_search_document(new_context)
+    if old_context is not None and build_search_document(old_context) == document:
+        return
+    index_document(db, user_id, document)
+
+
+def _terms(query: str) -> List[str]:
+    # Лише слова: користувацький ввід не потрапляє в синтаксис MATCH / tsquery
+    return re.findall(r"\w+", query.lower())
+
+
+def search(db: DBSession, query: str = "", skills: Sequence[str] = (), limit: int = 20,
+           offset: int = 0) -> List[SearchHit]:
+    """Ранжований пошук. `query` — слова (з префіксним збігом), `skills` — обов'язкові навички."""
+    dialect = _dialect(db)
+    if not ensure_search_index(db):
+        return []
+
+    terms = _terms(query)
+    skill_terms = [term for skill in skills for term in _terms(skill)]
+    if not terms and not skill_terms:
+        return []
+
+    params = {"limit": limit, "offset": offset}
+
+    if dialect == "sqlite":
+        clauses = [" ".join(f'"{t}"*' for t in terms)] if terms else []
+        clauses += [f'skills : "{t}"' for t in skill_terms]
+        params["match"] = " AND ".join(f"({c})" for c in clauses)
+        rows = db.execute(text(
+            f"SELECT rowid AS user_id, full_name, "
+            f"bm25({INDEX_TABLE}, 1.0, {WEIGHT_SKILLS}, {WEIGHT_ROLES}, {WEIGHT_CONTENT}) AS rank "
+            f"FROM {INDEX_TABLE} WHERE {INDEX_TABLE} MATCH :match "
+            "ORDER BY rank LIMIT :limit OFFSET :offset"), params)
+        # bm25 у SQLite: менше — краще
+        return [SearchHit(row.user_id, row.full_name, -row.rank) for row in rows]
+
+    conditions = []
+    if terms:
+        params["query"] = " & ".join(f"{t}:*" for t in terms)
+        conditions.append("document @@ to_tsquery('simple', :query)")
+    if skill_terms:
+        params["skills"] = " & ".join(skill_terms)
+        conditions.append("skills_vector @@ to_tsquery('simple', :skills)")
+    rank_query = ":query" if terms else ":skills"
+    rows = db.execute(text(
+        f"SELECT user_id, full_name, "
+        f"ts_rank_cd(document, to_tsquery('simple', {rank_query})) AS rank "
+        f"FROM {INDEX_TABLE} WHERE {' AND '.join(conditions)} "
+        "ORDER BY rank DESC LIMIT :limit OFFSET :offset"), params)
+    return [SearchHit(row.user_id, row.full_name, row.rank) for row in rows]
+
+
+def rebuild_index(db: DBSession, batch_size: int = 1000) -> int:
+    """Повна переіндексація з таблиці sessions (батчами, без завантаження всього в пам'ять)."""
+    if not ensure_search_index(db):
+        return 0
+    db.execute(text(f"DELETE FROM {INDEX_TABLE}"))
+    stmt = select(Session.user_id, Session.context).execution_options(yield_per=batch_size, stream_results=True)
+    count = 0
+    for partition in db.execute(stmt).partitions():
+        for row in partition:
+            index_document(db, row.user_id, build_search_document(row.context))
+            count += 1
+    db.commit()
+    return count
+
+
+def main(argv: Optional[list] = None):
+    from app.core.database import get_db
+
+    parser = argparse.ArgumentParser(description="Пошук по резюме CV on the Go")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("rebuild", help="Перебудувати індекс з таблиці sessions")
+    query_parser = commands.add_parser("query", help="Пошук")
+    query_parser.add_argument("query", nargs="?", default="")
+    query_parser.add_argument("--skill", action="append", default=[])
+    query_parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    db = get_db()
+    try:
+        if args.command == "rebuild":
+            print(f"Проіндексовано: {rebuild_index(db)}")
+        else:
+            for hit in search(db, args.query, args.skill, args.limit):
+                print(f"{hit.score:8.3f}  user_id={hit.user_id}  {hit.full_name}")
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,15 @@
 from sqlalchemy.orm import Session as DBSession
 from sqlalchemy.orm.attributes import flag_modified
-from app.models.orm import User, Session
-from app.models.schemas import ResumeData
+from pydantic import ValidationError
+from app.models.orm import User, Session, RenderMetric, UserTenant
+from app.models.schemas import (
+    ResumeData, MAX_SHORT_TEXT, MAX_LONG_TEXT, MAX_LIST_ITEMS, MAX_SKILLS, MAX_DESCRIPTION_ITEMS,
+)
+from app.logic import search
 from datetime import datetime
 import copy
 import json
+from typing import Optional
 
 # --- КОНСТАНТИ КРОКІВ ---
 STEP_START = "START"
@@ -27,9 +32,27 @@ STEP_WAITING_EDU_YEAR = "WAITING_EDU_YEAR"
 # Навички
 STEP_WAITING_SKILL = "WAITING_SKILL"
 
+# Проєкти
+STEP_WAITING_PROJECT_NAME = "WAITING_PROJECT_NAME"
+STEP_WAITING_PROJECT_DESC = "WAITING_PROJECT_DESC"
 
-def get_or_create_user(db: DBSession, telegram_id: int, user_data: dict) -> User:
-    """Знаходить користувача за telegram_id або створює нового."""
+# Мови
+STEP_WAITING_LANGUAGE = "WAITING_LANGUAGE"
+
+# Сертифікати
+STEP_WAITING_CERT_NAME = "WAITING_CERT_NAME"
+STEP_WAITING_CERT_YEAR = "WAITING_CERT_YEAR"
+
+# Фото
+STEP_WAITING_PHOTO = "WAITING_PHOTO"
+
+
+def get_or_create_user(db: DBSession, telegram_id: int, user_data: dict, tenant: Optional[str] = None) -> User:
+    """Знаходить користувача за telegram_id або створює нового.
+
+    tenant — ім'я бота-орендаря, якому написав користувач (режим кількох ботів):
+    зв'язок записується в user_tenants, щоб розсилки кожного бота йшли лише його користувачам.
+    """
     user = db.query(User).filter(User.telegram_id == telegram_id).first()
     
     if not user:
@@ -46,7 +69,21 @@ def get_or_create_user(db: DBSession, telegram_id: int, user_data: dict) -> User
         session = Session(user_id=user.id, current_step=STEP_START, context={})
         db.add(session)
         db.commit()
-    
+    elif user.is_blocked and tenant is None:
+        # Користувач знову пише боту — отже, розблокував його; повертаємо в розсилки
+        user.is_blocked = False
+        db.commit()
+
+    if tenant is not None:
+        link = db.query(UserTenant).filter(UserTenant.user_id == user.id, UserTenant.tenant == tenant).first()
+        if link is None:
+            db.add(UserTenant(user_id=user.id, tenant=tenant))
+            db.commit()
+        elif link.is_blocked:
+            # Розблоковує лише того бота, якому користувач написав
+            link.is_blocked = False
+            db.commit()
+
     return user
 
 
@@ -88,6 +125,64 @@ def update_session_context(db: DBSession, user_id: int, new_data: dict, next_ste
     return session
 
 
+def build_experience_item(temp_exp: dict) -> dict:
+    """Перетворює тимчасовий буфер досвіду на запис ExperienceItem."""
+    return {
+        "company": temp_exp.get("company"),
+        "job_title": temp_exp.get("position"),
+        "start_date": temp_exp.get("period"),
+        "end_date": None,
+        "description": [temp_exp.get("description")]
+    }
+
+
+def build_education_item(temp_edu: dict) -> dict:
+    """Перетворює тимчасовий буфер освіти на запис EducationItem."""
+    return {
+        "institution": temp_edu.get("institution"),
+        "degree": temp_edu.get("degree"),
+        "year_finished": temp_edu.get("year"),
+        "city": ""
+    }
+
+
+def append_section_item(context: dict, temp_key: str, target_key: str, build_item) -> dict:
+    """Переносить тимчасовий буфер `temp_key` у список `target_key` (без звернень до БД).
+
+    Повертає новий елемент або None, якщо буфер порожній. `context` змінюється на місці.
+    """
+    temp = context.get(temp_key)
+    if not temp:
+        return None
+    new_item = build_item(temp)
+    items = list(context.get(target_key, []))
+    items.append(new_item)
+    context[target_key] = items
+    del context[temp_key]
+    return new_item
+
+
+def save_session_state(db: DBSession, session: Session, context: dict, next_step: str = None) -> Session:
+    """Записує весь контекст і крок сесії одним комітом (разом з пошуковим індексом)."""
+    # Індекс оновлюється в тій самій транзакції і лише якщо змінились навички/досвід
+    search.index_session_context(db, session.user_id, session.context, context)
+    session.context = context
+    flag_modified(session, "context")
+    if next_step:
+        session.current_step = next_step
+    session.updated_at = datetime.utcnow()
+
+    try:
+        db.add(session)
+        db.commit()
+    except Exception as e:
+        print(f"CRITICAL ERROR SAVING SESSION: {e}")
+        db.rollback()
+        raise
+
+    return session
+
+
 def add_experience_item(db: DBSession, telegram_id: int) -> Session:
     """Фіналізує та додає досвід роботи."""
     print(f"--- ADD EXPERIENCE for TG ID: {telegram_id} ---")
@@ -97,26 +192,10 @@ def add_experience_item(db: DBSession, telegram_id: int) -> Session:
     if not session: return None
         
     context = copy.deepcopy(session.context) or {}
-    temp_exp = context.get("temp_experience", {})
+    new_job = append_section_item(context, "temp_experience", "experience", build_experience_item)
     
-    if temp_exp:
-        experience_list = context.get("experience", [])
-        new_job = {
-            "company": temp_exp.get("company"),
-            "job_title": temp_exp.get("position"),
-            "start_date": temp_exp.get("period"),
-            "end_date": None,
-            "description": [temp_exp.get("description")]
-        }
-        experience_list.append(new_job)
-        context["experience"] = experience_list
-        if "temp_experience" in context: del context["temp_experience"]
-            
-        session.context = context
-        flag_modified(session, "context")
-        session.current_step = STEP_IDLE
-        db.add(session)
-        db.commit()
+    if new_job:
+        save_session_state(db, session, context, next_step=STEP_IDLE)
         print(f"SUCCESS: JOB ADDED: {new_job}")
         
     return session
@@ -131,25 +210,10 @@ def add_education_item(db: DBSession, telegram_id: int) -> Session:
     if not session: return None
         
     context = copy.deepcopy(session.context) or {}
-    temp_edu = context.get("temp_education", {})
+    new_edu = append_section_item(context, "temp_education", "education", build_education_item)
     
-    if temp_edu:
-        edu_list = context.get("education", [])
-        new_edu = {
-            "institution": temp_edu.get("institution"),
-            "degree": temp_edu.get("degree"),
-            "year_finished": temp_edu.get("year"),
-            "city": ""
-        }
-        edu_list.append(new_edu)
-        context["education"] = edu_list
-        if "temp_education" in context: del context["temp_education"]
-            
-        session.context = context
-        flag_modified(session, "context")
-        session.current_step = STEP_IDLE
-        db.add(session)
-        db.commit()
+    if new_edu:
+        save_session_state(db, session, context, next_step=STEP_IDLE)
         print(f"SUCCESS: EDUCATION ADDED: {new_edu}")
     
     return session
@@ -170,18 +234,74 @@ def add_skill_item(db: DBSession, telegram_id: int, skill_text: str) -> Session:
     skills_list.append(skill_text)
     context["skills"] = skills_list
     
-    session.context = context
-    flag_modified(session, "context")
-    session.current_step = STEP_IDLE
-    
-    db.add(session)
-    db.commit()
+    save_session_state(db, session, context, next_step=STEP_IDLE)
     print(f"SUCCESS: SKILL ADDED: {skill_text}")
     return session
 
 
-def transform_session_to_resume_data(session: Session) -> ResumeData:
-    context = session.context or {}
+def save_render_metrics(db: DBSession, user_id: int, profile: str, size_bytes: int,
+                        render_seconds: float) -> RenderMetric:
+    """Записує метрики згенерованого PDF (ВНУТРІШНІЙ user_id)."""
+    metric = RenderMetric(user_id=user_id, profile=profile, size_bytes=size_bytes, render_seconds=render_seconds)
+    db.add(metric)
+    db.commit()
+    return metric
+
+
+def _clip(value, limit: int):
+    """Обрізає рядок або список, довший за ліміт."""
+    if isinstance(value, (str, list)) and len(value) > limit:
+        return value[:limit]
+    return value
+
+
+def _clip_item(item, long_fields: tuple = ()):
+    """Обрізає поля елемента секції: рядки до MAX_SHORT_TEXT (long_fields — до MAX_LONG_TEXT),
+    списки пунктів (опис досвіду) — до MAX_DESCRIPTION_ITEMS."""
+    if not isinstance(item, dict):
+        return _clip(item, MAX_SHORT_TEXT)
+    clipped = {}
+    for key, value in item.items():
+        limit = MAX_LONG_TEXT if key in long_fields else MAX_SHORT_TEXT
+        if isinstance(value, list):
+            clipped[key] = [_clip(entry, limit) for entry in _clip(value, MAX_DESCRIPTION_ITEMS)]
+        else:
+            clipped[key] = _clip(value, limit)
+    return clipped
+
+
+def _clip_section(items, max_items: int = MAX_LIST_ITEMS, long_fields: tuple = ()) -> list:
+    return [_clip_item(item, long_fields) for item in _clip(items or [], max_items)]
+
+
+def clip_resume_dict(resume_dict: dict) -> dict:
+    """Обрізає рядки та списки словника ResumeData до лімітів (schemas.MAX_*).
+
+    Дані, збережені до введення лімітів, інакше не проходили б валідацію і
+    користувач не міг би згенерувати резюме.
+    """
+    personal = dict(resume_dict["personal"])
+    for key, value in personal.items():
+        if key != "photo_id":
+            personal[key] = _clip(value, MAX_LONG_TEXT if key == "summary" else MAX_SHORT_TEXT)
+    return {
+        "personal": personal,
+        "experience": _clip_section(resume_dict["experience"], long_fields=("description",)),
+        "education": _clip_section(resume_dict["education"]),
+        "skills": _clip_section(resume_dict["skills"], MAX_SKILLS),
+        "projects": _clip_section(resume_dict["projects"], long_fields=("description",)),
+        "languages": _clip_section(resume_dict["languages"], MAX_SKILLS),
+        "certificates": _clip_section(resume_dict["certificates"]),
+    }
+
+
+def build_resume_dict(context: dict, clip: bool = False) -> dict:
+    """Перетворює контекст сесії на словник у форматі ResumeData (без валідації).
+
+    clip=True — обрізати застарілі завеликі дані до лімітів (лише для рендеру;
+    експорт отримує дані повністю, а перевищення видно як validation_error).
+    """
+    context = context or {}
     personal = context.get("personal", {})
 
     resume_dict = {
@@ -193,18 +313,28 @@ def transform_session_to_resume_data(session: Session) -> ResumeData:
             "telegram_username": personal.get("telegram_username"),
             "linkedin": personal.get("linkedin"),
             "github": personal.get("github"),
-            "website": personal.get("website")
+            "website": personal.get("website"),
+            "photo_id": personal.get("photo_id")
         },
         "experience": context.get("experience", []),
         "education": context.get("education", []),
         "skills": context.get("skills", []),
-        "projects": context.get("projects", [])
+        "projects": context.get("projects", []),
+        "languages": context.get("languages", []),
+        "certificates": context.get("certificates", [])
     }
+    return clip_resume_dict(resume_dict) if clip else resume_dict
+
+
+def transform_session_to_resume_data(session: Session) -> ResumeData:
+    resume_dict = build_resume_dict(session.context, clip=True)
     
     print(f"DEBUG DATA FOR PDF: {resume_dict}")
 
     try:
         return ResumeData(**resume_dict)
-    except Exception as e:
+    except ValidationError as e:
         print(f"Validation Error: {e}")
-        raise ValueError(f"{e}")
+        # Назви полів замість повного дампу pydantic — повідомлення бачить користувач
+        fields = ", ".join(".".join(str(part) for part in error["loc"]) for error in e.errors())
+        raise ValueError(f"Некоректні дані резюме у полях: {fields}")
@@ -9,6 +9,7 @@ from telegram import Update
 
 # Імпорти ваших модулів
 from app.core.database import init_db
+from app.bot.admission import guard, COST_TEXT, COST_COMMAND, COST_RENDER
 from app.bot.handlers import start_command, generate_command, message_handler
 
 # Завантажуємо змінні середовища
@@ -25,9 +26,9 @@ tg_application = None
 
 def init_telegram_bot_handlers(application: Application):
     """Додає обробники команд до Telegram Application."""
-    application.add_handler(CommandHandler("start", start_command))
-    application.add_handler(CommandHandler("generate", generate_command))
-    application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, message_handler))
+    application.add_handler(CommandHandler("start", guard(start_command, COST_COMMAND)))
+    application.add_handler(CommandHandler("generate", guard(generate_command, COST_RENDER, render=True)))
+    application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, guard(message_handler, COST_TEXT)))
 
 
 def setup_telegram_bot(url_path: str):
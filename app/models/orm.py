@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, Boolean, ForeignKey, JSON
+from sqlalchemy import (Column, Integer, BigInteger, String, Text, DateTime, Boolean, Float, ForeignKey, JSON,
+                        UniqueConstraint)
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
@@ -24,6 +25,9 @@ class User(Base):
     username = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     last_active_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Користувач заблокував бота — розсилки його пропускають (режим одного бота;
+    # у режимі кількох ботів — UserTenant.is_blocked)
+    is_blocked = Column(Boolean, default=False, nullable=False)
 
     # Зв'язки
     sessions = relationship("Session", back_populates="user")
@@ -47,6 +51,19 @@ class Session(Base):
     user = relationship("User", back_populates="sessions")
 
 
+class UserTenant(Base):
+    """Таблиця user_tenants: з якими ботами (орендарями, app/bot/tenants.py) спілкувався користувач."""
+    __tablename__ = "user_tenants"
+    __table_args__ = (UniqueConstraint("user_id", "tenant"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    tenant = Column(String, nullable=False, index=True)  # Tenant.name
+    # Користувач заблокував саме цього бота — його розсилки користувача пропускають
+    is_blocked = Column(Boolean, default=False, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
 # -------------------- 2. МОДЕЛІ РЕЗЮМЕ ТА ШАБЛОНІВ --------------------
 
 class Template(Base):
@@ -102,4 +119,38 @@ class PDFFile(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
     # Зв'язки
-    resume = relationship("Resume", back_populates="pdf_files")
\ No newline at end of file
+    resume = relationship("Resume", back_populates="pdf_files")
+
+
+class RenderMetric(Base):
+    """Таблиця render_metrics: профіль, розмір і час рендеру кожного згенерованого PDF."""
+    __tablename__ = "render_metrics"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    profile = Column(String, nullable=False)  # standard / compact (після вибору в режимі auto)
+    size_bytes = Column(Integer, nullable=False)
+    render_seconds = Column(Float, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+# -------------------- 3. РОЗСИЛКИ --------------------
+
+class Broadcast(Base):
+    """Таблиця broadcasts: розсилка всім користувачам з контрольною точкою для відновлення."""
+    __tablename__ = "broadcasts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    text = Column(Text, nullable=False)
+    status = Column(String, default="pending")  # pending / running / done
+    # Бот-орендар, від імені якого йде розсилка (None — режим одного бота, усі користувачі)
+    tenant = Column(String, nullable=True)
+
+    # Контрольна точка: усі користувачі з id <= last_user_id уже оброблені
+    last_user_id = Column(Integer, default=0, nullable=False)
+    delivered = Column(Integer, default=0, nullable=False)
+    failed = Column(Integer, default=0, nullable=False)
+    blocked = Column(Integer, default=0, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,38 +1,63 @@
-from typing import List, Optional
+from typing import Annotated, List, Optional
 from pydantic import BaseModel, Field
 
+# --- Ліміти розміру вводу ---
+# Обмежують вартість одного рендеру (час і пам'ять WeasyPrint) незалежно від того, що ввів користувач
+MAX_SHORT_TEXT = 200       # ім'я, компанія, посада, дати, навичка...
+MAX_LONG_TEXT = 3000       # summary, опис обов'язків/проєкту
+MAX_LIST_ITEMS = 50        # елементів у секції (досвід, освіта, проєкти...)
+MAX_SKILLS = 100           # навичок / мов
+MAX_DESCRIPTION_ITEMS = 20  # пунктів опису в одному місці роботи
+
+ShortText = Annotated[str, Field(max_length=MAX_SHORT_TEXT)]
+LongText = Annotated[str, Field(max_length=MAX_LONG_TEXT)]
+
 # --- Схеми для Складових Частин Резюме ---
 
 class PersonalInfo(BaseModel):
     """Схема для особистої інформації користувача."""
     # Змінив EmailStr на str, щоб уникнути помилок, якщо користувач введе пробіл випадково
-    full_name: str = Field(..., min_length=2, description="Повне ім'я та прізвище")
-    email: Optional[str] = Field(None, description="Контактна електронна пошта")
-    phone: Optional[str] = Field(None, description="Контактний телефон")
+    full_name: str = Field(..., min_length=2, max_length=MAX_SHORT_TEXT, description="Повне ім'я та прізвище")
+    email: Optional[str] = Field(None, max_length=MAX_SHORT_TEXT, description="Контактна електронна пошта")
+    phone: Optional[str] = Field(None, max_length=MAX_SHORT_TEXT, description="Контактний телефон")
     # Змінив HttpUrl на str, бо користувачі часто лінуються писати https://
-    linkedin: Optional[str] = Field(None, description="Посилання на профіль LinkedIn")
-    github: Optional[str] = Field(None, description="Посилання на GitHub")
-    website: Optional[str] = Field(None, description="Вебсайт")
-    telegram_username: Optional[str] = Field(None, description="Telegram")
-    summary: Optional[str] = Field(None, description="Коротке резюме")
+    linkedin: Optional[str] = Field(None, max_length=MAX_SHORT_TEXT, description="Посилання на профіль LinkedIn")
+    github: Optional[str] = Field(None, max_length=MAX_SHORT_TEXT, description="Посилання на GitHub")
+    website: Optional[str] = Field(None, max_length=MAX_SHORT_TEXT, description="Вебсайт")
+    telegram_username: Optional[str] = Field(None, max_length=MAX_SHORT_TEXT, description="Telegram")
+    summary: Optional[str] = Field(None, max_length=MAX_LONG_TEXT, description="Коротке резюме")
+    # file_unique_id фото з Telegram; саме зображення береться з кешу похідних
+    photo_id: Optional[str] = Field(None, max_length=MAX_SHORT_TEXT, description="Фото профілю")
 
 
 class ExperienceItem(BaseModel):
     """Схема для одного запису досвіду роботи."""
-    job_title: str = Field(..., description="Назва посади")
-    company: str = Field(..., description="Назва компанії")
+    job_title: str = Field(..., max_length=MAX_SHORT_TEXT, description="Назва посади")
+    company: str = Field(..., max_length=MAX_SHORT_TEXT, description="Назва компанії")
     # ВАЖЛИВО: Змінив date на str, щоб приймати текст "Вересень 2021"
-    start_date: str = Field(..., description="Дата початку роботи")
-    end_date: Optional[str] = Field(None, description="Дата завершення роботи")
-    description: List[str] = Field(..., description="Список обов'язків")
+    start_date: str = Field(..., max_length=MAX_SHORT_TEXT, description="Дата початку роботи")
+    end_date: Optional[str] = Field(None, max_length=MAX_SHORT_TEXT, description="Дата завершення роботи")
+    description: List[LongText] = Field(..., max_length=MAX_DESCRIPTION_ITEMS, description="Список обов'язків")
 
 
 class EducationItem(BaseModel):
     """Схема для одного запису про освіту."""
-    degree: str = Field(..., description="Ступінь")
-    institution: str = Field(..., description="Навчальний заклад")
-    city: Optional[str] = Field(None, description="Місто")
-    year_finished: str = Field(..., description="Рік завершення")
+    degree: str = Field(..., max_length=MAX_SHORT_TEXT, description="Ступінь")
+    institution: str = Field(..., max_length=MAX_SHORT_TEXT, description="Навчальний заклад")
+    city: Optional[str] = Field(None, max_length=MAX_SHORT_TEXT, description="Місто")
+    year_finished: str = Field(..., max_length=MAX_SHORT_TEXT, description="Рік завершення")
+
+
+class ProjectItem(BaseModel):
+    """Схема для одного проєкту."""
+    name: str = Field(..., max_length=MAX_SHORT_TEXT, description="Назва проєкту")
+    description: Optional[str] = Field(None, max_length=MAX_LONG_TEXT, description="Опис проєкту")
+
+
+class CertificateItem(BaseModel):
+    """Схема для одного сертифіката."""
+    name: str = Field(..., max_length=MAX_SHORT_TEXT, description="Назва сертифіката")
+    year: Optional[str] = Field(None, max_length=MAX_SHORT_TEXT, description="Рік отримання")
 
 
 # --- Головна Схема Даних Резюме ---
@@ -40,8 +65,10 @@ class EducationItem(BaseModel):
 class ResumeData(BaseModel):
     """Головна структура, що містить усі дані для генерації PDF."""
     personal: PersonalInfo
-    experience: List[ExperienceItem] = Field(default_factory=list)
-    education: List[EducationItem] = Field(default_factory=list)
+    experience: List[ExperienceItem] = Field(default_factory=list, max_length=MAX_LIST_ITEMS)
+    education: List[EducationItem] = Field(default_factory=list, max_length=MAX_LIST_ITEMS)
     # Поки що зробимо skills простим списком рядків, бо ми ще не робили групування
-    skills: List[str] = Field(default_factory=list)
-    projects: List[dict] = Field(default_factory=list)
+    skills: List[ShortText] = Field(default_factory=list, max_length=MAX_SKILLS)
+    projects: List[ProjectItem] = Field(default_factory=list, max_length=MAX_LIST_ITEMS)
+    languages: List[ShortText] = Field(default_factory=list, max_length=MAX_SKILLS)
+    certificates: List[CertificateItem] = Field(default_factory=list, max_length=MAX_LIST_ITEMS)
@@ -0,0 +1,43 @@
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Optional
+
+from app.models.schemas import ResumeData
+
+
+def resume_content_hash(resume_data: ResumeData, variant: str = "pdf") -> str:
+    """Стабільний хеш вмісту резюме (однакові дані -> однаковий хеш)."""
+    payload = json.dumps(resume_data.model_dump(), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(f"{variant}:{payload}".encode("utf-8")).hexdigest()
+
+
+class ContentCache:
+    """Простий LRU-кеш згенерованих документів за хешем вмісту."""
+
+    def __init__(self, max_items: int = 128):
+        self.max_items = max_items
+        self._items: "OrderedDict[str, bytes]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self._items.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: bytes) -> None:
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
@@ -0,0 +1,162 @@
+"""Розбиття великого резюме на частини для посекційної верстки.
+
+Час верстки WeasyPrint росте швидше за лінійний із довжиною документа, тому
+великі резюме верстаються частинами (кожна — приблизно сторінка), а сторінки
+потім зливаються в один PDF. Частини рендеряться тим самим шаблоном і CSS.
+Вага елементів — оцінка висоти в рядках з урахуванням переносу тексту; запис
+досвіду, що не вміщується на сторінку, ділиться по пунктах опису.
+"""
+import math
+from dataclasses import dataclass, field
+from typing import List, Set
+
+from app.models.schemas import ResumeData
+
+# Порядок секцій як у шаблоні resume_template.html
+SECTION_ORDER = ("experience", "education", "projects", "skills", "languages", "certificates")
+
+# Секції з короткими рядками, які не ділимо між частинами
+INLINE_SECTIONS = ("skills", "languages")
+
+
+# Позначка в Chunk.continued: перший запис досвіду частини продовжує запис з попередньої
+CONTINUED_ITEM = "experience_item"
+
+# Геометрія templates/resume_template.html на сторінці A4 WeasyPrint (поля 75px,
+# padding body 40px): ширина тексту ~560px, висота сторінки ~970px. Одиниця ваги —
+# рядок пункту списку (14px x line-height 1.6 = 22.4px), тож сторінка вміщує ~43 рядки.
+CHARS_PER_LINE = 75          # li, 14px: ~7px на символ
+SUMMARY_CHARS_PER_LINE = 65  # p, 16px
+PARAGRAPH_LINE = 1.15        # рядок абзацу 16px у рядках li
+HEADER_LINES = 7             # padding body + h1 + контакти
+HEADING_LINES = 4            # h2 секції з відступами
+ITEM_HEADER_LINES = 2.3      # заголовок елемента (посада, дати) + margin-bottom
+BULLET_LINES = 0.2           # margin-bottom кожного li
+LIST_LINES = 0.7             # відступи ul
+TAG_ROW_LINES = 2            # рядок тегів навичок (padding, border, gap)
+TAG_EXTRA_CHARS = 5          # padding/gap тегу в символах
+
+
+@dataclass
+class Chunk:
+    """Частина документа: зріз секцій і прапорці для шаблону."""
+    sections: dict = field(default_factory=dict)
+    # Секції, заголовок яких уже був у попередній частині
+    continued: Set[str] = field(default_factory=set)
+    cost: float = 0.0
+
+
+def _text_lines(text: str, chars_per_line: int) -> int:
+    """Кількість рядків тексту з урахуванням переносу."""
+    return max(1, math.ceil(len(text) / chars_per_line))
+
+
+def _item_cost(section: str, item, continued: bool = False) -> float:
+    """Приблизна висота елемента в рядках верстки (з переносом довгого тексту).
+
+    continued — продовження запису досвіду з попередньої частини (без заголовка запису).
+    """
+    if section == "experience":
+        bullets = sum(_text_lines(line, CHARS_PER_LINE) + BULLET_LINES for line in item.description)
+        header = 0 if continued else ITEM_HEADER_LINES
+        return header + (LIST_LINES + bullets if item.description else 0)
+    if section == "projects" and item.description:
+        return ITEM_HEADER_LINES + _text_lines(item.description, SUMMARY_CHARS_PER_LINE) * PARAGRAPH_LINE
+    return ITEM_HEADER_LINES
+
+
+def _split_item(item, space: float, continued: bool):
+    """Ділить пункти опису запису досвіду: перша частина вміщується в `space` рядків.
+
+    None — якщо не вміщується жоден пункт або запис і так вміщується цілим.
+    """
+    used = (0 if continued else ITEM_HEADER_LINES) + LIST_LINES
+    fits = 0
+    for line in item.description:
+        used += _text_lines(line, CHARS_PER_LINE) + BULLET_LINES
+        if used > space:
+            break
+        fits += 1
+    if fits == 0 or fits == len(item.description):
+        return None
+    return (item.model_copy(update={"description": item.description[:fits]}),
+            item.model_copy(update={"description": item.description[fits:]}))
+
+
+def _inline_cost(items: List[str]) -> float:
+    """Секція тегів: рядки тегів за сумарною шириною."""
+    width = sum(len(text) + TAG_EXTRA_CHARS for text in items)
+    return HEADING_LINES + max(1, math.ceil(width / CHARS_PER_LINE)) * TAG_ROW_LINES
+
+
+def _header_cost(resume_data: ResumeData) -> float:
+    summary = resume_data.personal.summary
+    if not summary:
+        return HEADER_LINES
+    return HEADER_LINES + HEADING_LINES + _text_lines(summary, SUMMARY_CHARS_PER_LINE) * PARAGRAPH_LINE
+
+
+def layout_cost(resume_data: ResumeData) -> float:
+    """Оцінка висоти документа в рядках для вибору режиму верстки."""
+    total = _header_cost(resume_data)
+    for section in SECTION_ORDER:
+        items = getattr(resume_data, section)
+        if not items:
+            continue
+        if section in INLINE_SECTIONS:
+            total += _inline_cost(items)
+        else:
+            total += HEADING_LINES + sum(_item_cost(section, item) for item in items)
+    return total
+
+
+def split_into_chunks(resume_data: ResumeData, chunk_budget: float) -> List[Chunk]:
+    """Ділить резюме на частини висотою не більше `chunk_budget` рядків (~сторінка)."""
+    chunks = [Chunk(cost=_header_cost(resume_data))]
+
+    for section in SECTION_ORDER:
+        items = getattr(resume_data, section)
+        if not items:
+            continue
+
+        if section in INLINE_SECTIONS:
+            cost = _inline_cost(items)
+            if chunks[-1].cost + cost > chunk_budget and chunks[-1].sections:
+                chunks.append(Chunk())
+            chunks[-1].sections[section] = list(items)
+            chunks[-1].cost += cost
+            continue
+
+        for item in items:
+            continued_item = False
+            while True:
+                current = chunks[-1]
+                # Заголовок секції займає місце лише там, де він з'являється
+                heading = 0 if section in current.sections or section in current.continued else HEADING_LINES
+                cost = heading + _item_cost(section, item, continued_item)
+                fits = current.cost + cost <= chunk_budget
+                # Довгий запис досвіду ділиться між сторінками, як і при верстці одним проходом
+                parts = None
+                if not fits and section == "experience":
+                    parts = _split_item(item, chunk_budget - current.cost - heading, continued_item)
+                if fits or (not current.cost and parts is None):
+                    current.sections.setdefault(section, []).append(item)
+                    current.cost += cost
+                    break
+                if parts is not None:
+                    head, item = parts
+                    current.sections.setdefault(section, []).append(head)
+                    current.cost += heading + _item_cost(section, head, continued_item)
+                started = any(section in c.sections for c in chunks)
+                chunks.append(Chunk(continued={section} if started else set()))
+                if parts is not None:
+                    chunks[-1].continued.add(CONTINUED_ITEM)
+                continued_item = parts is not None
+
+    return chunks
+
+
+def chunk_resume_data(resume_data: ResumeData, chunk: Chunk) -> ResumeData:
+    """ResumeData лише з секціями частини (personal лишається для валідації шаблону)."""
+    update = {section: chunk.sections.get(section, []) for section in SECTION_ORDER}
+    return resume_data.model_copy(update=update)
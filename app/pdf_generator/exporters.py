@@ -0,0 +1,47 @@
+"""Легкі формати експорту (HTML, Markdown, текст) без верстки WeasyPrint."""
+import re
+from typing import Optional
+
+from app.models.schemas import ResumeData
+from app.pdf_generator.cache import ContentCache, resume_content_hash
+from app.pdf_generator.templating import TemplateSource, render_html
+
+# Формат -> (шаблон, розширення файлу)
+EXPORT_FORMATS = {
+    "html": ("resume_template.html", "html"),
+    "md": ("resume_template.md", "md"),
+    "txt": ("resume_template.txt", "txt"),
+}
+
+
+def _tidy(text: str) -> str:
+    # Прибираємо зайві порожні рядки, які лишають блоки {% if %}
+    return re.sub(r"\n{3,}", "\n\n", text).strip() + "\n"
+
+
+def export_resume(resume_data: ResumeData, fmt: str, cache: Optional[ContentCache] = None,
+                  template: Optional[TemplateSource] = None) -> bytes:
+    """Рендерить резюме у текстовий формат. Результат кешується за хешем вмісту.
+
+    `template` (шаблон бота-орендаря) застосовується лише до HTML: md/txt однакові для всіх.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Невідомий формат експорту: {fmt}")
+    if fmt != "html":
+        template = None
+
+    key = resume_content_hash(resume_data, variant=fmt if template is None else f"{fmt}:{template.cache_key}")
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    template_name, _ = EXPORT_FORMATS[fmt]
+    output = render_html(resume_data, template_name, template=template)
+    if fmt != "html":
+        output = _tidy(output)
+    result = output.encode("utf-8")
+
+    if cache is not None:
+        cache.put(key, result)
+    return result
@@ -1,39 +1,114 @@
 import os
-from jinja2 import Environment, FileSystemLoader
-from weasyprint import HTML
+import time
+from dataclasses import dataclass
+from app.core import config
 from app.models.schemas import ResumeData
-from typing import Optional
+# Jinja2-середовище спільне для PDF та легких форматів експорту (exporters.py)
+from app.pdf_generator.templating import TEMPLATE_DIR, TemplateSource, jinja_env, render_html
+from app.pdf_generator.chunking import layout_cost, split_into_chunks, chunk_resume_data
+from typing import List, Optional
 
-# Визначаємо шлях до поточного файлу (generator.py)
-current_dir = os.path.dirname(os.path.abspath(__file__))
+# Профілі виводу: опції для HTML.write_pdf()
+PDF_PROFILES = {
+    # Налаштування WeasyPrint за замовчуванням: шрифти вже вбудовуються підмножиною
+    # без hinting, потоки стиснені (full_fonts/hinting/uncompressed_pdf = False)
+    "standard": {},
+    # Те саме плюс перекодовані та зменшені зображення (єдина відмінність від standard)
+    "compact": {
+        "optimize_images": True,
+        "jpeg_quality": 60,
+        "dpi": 150,
+    },
+}
 
-# Піднімаємося на два рівні вгору: app -> root
-# Потім заходимо в templates
-TEMPLATE_DIR = os.path.join(current_dir, '..', '..', 'templates')
-# Нормалізуємо шлях (прибираємо .., щоб він виглядав гарно)
-TEMPLATE_DIR = os.path.normpath(TEMPLATE_DIR)
 
-print(f"DEBUG: Шлях до шаблонів: {TEMPLATE_DIR}")
+@dataclass
+class PDFResult:
+    """Згенерований документ і його метрики."""
+    pdf_bytes: bytes
+    profile: str
+    size_bytes: int
+    render_seconds: float
 
-# Створюємо середовище Jinja2
-jinja_env = Environment(loader=FileSystemLoader(TEMPLATE_DIR))
 
+def render_html_parts(resume_data: ResumeData, chunked: bool,
+                      template: Optional[TemplateSource] = None) -> List[str]:
+    """HTML документа: одна частина або кілька для посекційної верстки."""
+    if not chunked:
+        return [render_html(resume_data, template=template)]
+    return [
+        render_html(chunk_resume_data(resume_data, chunk), template=template,
+                    body_only=i > 0, continued=chunk.continued)
+        for i, chunk in enumerate(split_into_chunks(resume_data, config.PDF_CHUNK_BUDGET))
+    ]
 
-def generate_pdf_from_data(resume_data: ResumeData) -> Optional[bytes]:
+
+def _write_pdf(html_parts: List[str], profile: str) -> PDFResult:
+    # WeasyPrint імпортується лише там, де верстається PDF (процеси рендеру прогрівають його заздалегідь)
+    from weasyprint import HTML
+
+    start = time.perf_counter()
+    options = PDF_PROFILES[profile]
+    if len(html_parts) == 1:
+        pdf_bytes = HTML(string=html_parts[0]).write_pdf(**options)
+    else:
+        # Кожна частина верстається окремо, сторінки зливаються в один документ
+        documents = [HTML(string=part).render(**options) for part in html_parts]
+        pages = [page for document in documents for page in document.pages]
+        pdf_bytes = documents[0].copy(pages).write_pdf(**options)
+    return PDFResult(pdf_bytes, profile, len(pdf_bytes), time.perf_counter() - start)
+
+
+def render_pdf(resume_data: ResumeData, profile: Optional[str] = None,
+               size_budget: Optional[int] = None, chunked: Optional[bool] = None,
+               template: Optional[TemplateSource] = None) -> PDFResult:
     """
-    Рендерить HTML-шаблон з даними та конвертує його в PDF.
+    Генерує PDF у вказаному профілі.
+    "auto": спочатку standard, а якщо розмір перевищує бюджет і в резюме є фото — повторно compact.
+    chunked=None: посекційна верстка вмикається сама для великих резюме (PDF_CHUNK_THRESHOLD).
+    Для шаблонів з БД (template.html) документ завжди верстається цілим.
     """
-    try:
-        # Завантажуємо шаблон
-        template = jinja_env.get_template('resume_template.html')
+    profile = profile or config.PDF_PROFILE
+    size_budget = config.PDF_SIZE_BUDGET if size_budget is None else size_budget
+    if profile != "auto" and profile not in PDF_PROFILES:
+        raise ValueError(f"Невідомий профіль PDF: {profile}")
 
-        # Рендеримо HTML
-        html_output = template.render(data=resume_data.model_dump())
+    if template is not None and template.html is not None:
+        # Шаблони з БД не знають про body_only/continued: кожна частина повторила б шапку
+        chunked = False
+    elif chunked is None:
+        chunked = layout_cost(resume_data) > config.PDF_CHUNK_THRESHOLD
+    html_parts = render_html_parts(resume_data, chunked, template)
 
-        # Генеруємо PDF
-        pdf_bytes = HTML(string=html_output).write_pdf()
+    if profile != "auto":
+        result = _write_pdf(html_parts, profile)
+    else:
+        result = _write_pdf(html_parts, "standard")
+        if result.size_bytes > size_budget and resume_data.personal.photo_id is None:
+            # compact відрізняється лише обробкою зображень, а єдине зображення — фото
+            print(f"PDF перевищив бюджет ({result.size_bytes} > {size_budget} байт), "
+                  f"але фото немає — compact не зменшить файл")
+        elif result.size_bytes > size_budget:
+            standard_size = result.size_bytes
+            compact = _write_pdf(html_parts, "compact")
+            compact.render_seconds += result.render_seconds
+            result = compact
+            print(f"PDF перевищив бюджет ({standard_size} > {size_budget} байт), "
+                  f"compact: {result.size_bytes} байт")
 
-        return pdf_bytes
+    print(f"PDF: {result.size_bytes} байт, профіль {result.profile}, "
+          f"частин {len(html_parts)}, {result.render_seconds:.2f} с")
+    return result
+
+
+def generate_pdf_from_data(resume_data: ResumeData, profile: Optional[str] = None,
+                           template: Optional[TemplateSource] = None) -> Optional[bytes]:
+    """
+    Рендерить HTML-шаблон з даними та конвертує його в PDF.
+    template=None — стандартний resume_template.html.
+    """
+    try:
+        return render_pdf(resume_data, profile, template=template).pdf_bytes
     except Exception as e:
         print(f"Помилка при генерації PDF: {e}")
         raise e
\ No newline at end of file
@@ -0,0 +1,86 @@
+"""Обробка фото профілю: вибір розміру з Telegram, обрізка/стиснення та кеш похідних.
+
+Похідне зображення зберігається на диску за file_unique_id (стабільний для однакового
+файлу в Telegram), тому процеси рендеру читають готові байти і не обробляють фото повторно.
+"""
+import base64
+import io
+import os
+from functools import lru_cache
+from typing import Optional, Sequence
+
+from app.core import config
+
+# Розмір фото в шаблоні (CSS-пікселі) та масштаб для друку
+PHOTO_WIDTH = 120
+PHOTO_HEIGHT = 150
+PHOTO_SCALE = 2
+PHOTO_JPEG_QUALITY = 85
+# Захист від "декомпресійних бомб": більші зображення не декодуються
+MAX_SOURCE_PIXELS = 40_000_000
+
+
+def pick_photo_size(sizes: Sequence):
+    """Найменший варіант PhotoSize, якого достатньо для шаблону (інакше найбільший)."""
+    min_width, min_height = PHOTO_WIDTH * PHOTO_SCALE, PHOTO_HEIGHT * PHOTO_SCALE
+    ordered = sorted(sizes, key=lambda size: size.width * size.height)
+    for size in ordered:
+        # Після обрізки до пропорцій шаблону потрібна хоча б одна зі сторін
+        if size.width >= min_width and size.height >= min_height:
+            return size
+    return ordered[-1]
+
+
+def process_photo(raw: bytes) -> bytes:
+    """Декодує, обрізає по центру до пропорцій шаблону, зменшує і кодує в JPEG.
+
+    Виконується у пулі процесів, а не в циклі подій бота.
+    """
+    from PIL import Image, ImageOps
+
+    Image.MAX_IMAGE_PIXELS = MAX_SOURCE_PIXELS
+    target = (PHOTO_WIDTH * PHOTO_SCALE, PHOTO_HEIGHT * PHOTO_SCALE)
+
+    with Image.open(io.BytesIO(raw)) as image:
+        image.draft("RGB", target)  # JPEG декодується одразу у зменшеному масштабі
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        image = ImageOps.fit(image, target, method=Image.LANCZOS)
+
+        output = io.BytesIO()
+        image.save(output, format="JPEG", quality=PHOTO_JPEG_QUALITY, optimize=True, progressive=True)
+        return output.getvalue()
+
+
+def _derivative_path(file_unique_id: str) -> str:
+    # file_unique_id складається з [A-Za-z0-9_-], але не довіряємо сліпо
+    safe_id = "".join(c for c in file_unique_id if c.isalnum() or c in "-_")
+    return os.path.join(config.PHOTO_CACHE_DIR, f"{safe_id}.jpg")
+
+
+def has_derivative(file_unique_id: str) -> bool:
+    return os.path.exists(_derivative_path(file_unique_id))
+
+
+def save_derivative(file_unique_id: str, data: bytes) -> None:
+    os.makedirs(config.PHOTO_CACHE_DIR, exist_ok=True)
+    path = _derivative_path(file_unique_id)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)  # атомарно: рендер не побачить напівзаписаний файл
+
+
+@lru_cache(maxsize=256)
+def _read_data_uri(file_unique_id: str) -> str:
+    # Похідні незмінні для свого id, тому їх безпечно кешувати в пам'яті процесу
+    with open(_derivative_path(file_unique_id), "rb") as f:
+        data = f.read()
+    return "data:image/jpeg;base64," + base64.b64encode(data).decode("ascii")
+
+
+def photo_data_uri(file_unique_id: str) -> Optional[str]:
+    """data: URI готового фото для вбудовування в HTML (None, якщо похідної немає)."""
+    try:
+        return _read_data_uri(file_unique_id)
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,301 @@
+"""Черга генерації PDF: одна задача на користувача (single-flight).
+
+- Повторний /generate з тими самими даними приєднується до задачі, що вже виконується.
+- Нові дані (або редагування під час рендеру) скасовують застарілу задачу. Якщо вона
+  вже рендериться в пулі процесів, процес вбивається і слот одразу звільняється.
+- Одночасно рендериться не більше `max_workers` документів, решта чекає в черзі.
+- Спекулятивний рендер: після завершення секції і паузи без редагувань резюме
+  рендериться у фоні в кеш, щоб /generate був миттєвим. Фонові задачі беруть лише
+  вільні слоти, завжди лишають один слот користувачам (з одним слотом фоновий рендер
+  вимкнено) і ніколи не обходять задачі користувачів у черзі.
+- Шаблон (бота-орендаря) входить у ключ кешу: однакові дані з різними шаблонами —
+  різні документи.
+"""
+import asyncio
+import functools
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, Hashable, Optional, Set, Tuple
+
+from app.models.schemas import ResumeData
+from app.pdf_generator.cache import ContentCache, resume_content_hash
+from app.pdf_generator.templating import TemplateSource
+from app.pdf_generator.workers import RenderWorkerPool
+
+# Як часто (с) друкувати статистику фонового рендеру
+STATS_REPORT_INTERVAL = 300.0
+
+
+def _render_hash(resume_data: ResumeData, template: Optional[TemplateSource]) -> str:
+    variant = "pdf" if template is None else f"pdf:{template.cache_key}"
+    return resume_content_hash(resume_data, variant=variant)
+
+
+@dataclass(eq=False)
+class RenderJob:
+    """Задача рендеру для одного користувача."""
+    # Ключ користувача: telegram id або (бот, telegram id) у режимі кількох ботів
+    user_id: Hashable
+    data_hash: str
+    resume_data: ResumeData
+    future: asyncio.Future
+    started: bool = False
+    cancelled: bool = False
+    waiters: int = field(default=1)
+    # Фонова задача без очікувачів; стає звичайною, якщо користувач натиснув /generate
+    speculative: bool = False
+    # None — стандартний шаблон
+    template: Optional[TemplateSource] = None
+    # PDFResult свіжого рендеру (профіль, розмір, час), якщо render_func його повертає
+    metrics: Optional[object] = None
+    # Внутрішній стан виконання: задача циклу подій і зайнятий слот
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+    speculative_slot: bool = False
+    slot_released: bool = False
+
+    async def wait(self) -> bytes:
+        # shield: скасування одного очікувача не скасовує саму задачу
+        return await asyncio.shield(self.future)
+
+
+class RenderQueue:
+    def __init__(self, render_func: Callable[[ResumeData], bytes], max_workers: int = 2,
+                 cache: Optional[ContentCache] = None, pool: Optional[RenderWorkerPool] = None,
+                 speculative_delay: Optional[float] = None):
+        self.render_func = render_func
+        self.max_workers = max_workers
+        self.cache = cache if cache is not None else ContentCache()
+        self.pool = pool  # None -> стандартний ThreadPoolExecutor циклу подій (без лімітів)
+        # None — спекулятивний рендер вимкнено; інакше пауза (с) без редагувань перед рендером
+        self.speculative_delay = speculative_delay
+        # Фонові рендери лишають щонайменше один слот для користувачів (0 — якщо слот один)
+        self.speculative_workers = max_workers - 1
+        self._jobs: Dict[Hashable, RenderJob] = {}
+        self._pending: Deque[RenderJob] = deque()
+        self._running = 0
+        self._speculative_jobs: Dict[Hashable, RenderJob] = {}
+        self._speculative_pending: Deque[RenderJob] = deque()
+        self._speculative_running = 0
+        self._speculative_timers: Dict[Hashable, asyncio.TimerHandle] = {}
+        self._speculated_hashes: Set[str] = set()
+        self.stats = {"speculative_started": 0, "speculative_hits": 0, "speculative_misses": 0}
+        self._stats_reported_at = time.monotonic()
+
+    def submit(self, user_id: Hashable, resume_data: ResumeData,
+               template: Optional[TemplateSource] = None) -> Tuple[RenderJob, bool]:
+        """Ставить рендер у чергу. Повертає (задача, приєднано_до_існуючої)."""
+        data_hash = _render_hash(resume_data, template)
+        loop = asyncio.get_running_loop()
+        self._report_stats()
+
+        job = self._jobs.get(user_id)
+        if job and not job.cancelled:
+            if job.data_hash == data_hash:
+                job.waiters += 1
+                return job, True
+            self.cancel(user_id)
+
+        self._cancel_timer(user_id)
+        speculative = self._speculative_jobs.pop(user_id, None)
+
+        cached = self.cache.get(data_hash)
+        if cached is not None:
+            if speculative:
+                self._cancel_job(speculative)
+            self._count_speculative(data_hash, hit=True)
+            job = RenderJob(user_id, data_hash, resume_data, loop.create_future(), template=template)
+            job.future.set_result(cached)
+            return job, False
+
+        if speculative and not speculative.cancelled and speculative.data_hash == data_hash:
+            # Фоновий рендер тих самих даних уже йде або чекає — підвищуємо його до звичайного
+            speculative.speculative = False
+            self._jobs[user_id] = speculative
+            if not speculative.started:
+                self._speculative_pending.remove(speculative)
+                self._pending.append(speculative)
+                self._pump()
+            self.stats["speculative_hits"] += 1
+            return speculative, False
+
+        if speculative:
+            self._cancel_job(speculative)
+        self._count_speculative(data_hash, hit=False)
+
+        job = RenderJob(user_id, data_hash, resume_data, loop.create_future(), template=template)
+        self._jobs[user_id] = job
+        self._pending.append(job)
+        self._pump()
+        return job, False
+
+    def needs_render(self, user_id: Hashable, resume_data: ResumeData,
+                     template: Optional[TemplateSource] = None) -> bool:
+        """Чи запустить submit() з тими самими аргументами новий рендер.
+
+        False — приєднання до задачі, що вже йде, відповідь з кешу або підвищення
+        фонового рендеру тих самих даних.
+        """
+        data_hash = _render_hash(resume_data, template)
+        job = self._jobs.get(user_id)
+        if job and not job.cancelled and job.data_hash == data_hash:
+            return False
+        if data_hash in self.cache:
+            return False
+        speculative = self._speculative_jobs.get(user_id)
+        return not (speculative and not speculative.cancelled and speculative.data_hash == data_hash)
+
+    def speculate(self, user_id: Hashable, resume_data: ResumeData,
+                  template: Optional[TemplateSource] = None) -> None:
+        """Планує фоновий рендер після паузи без редагувань (debounce)."""
+        if self.speculative_delay is None:
+            return
+        self._cancel_timer(user_id)
+        loop = asyncio.get_running_loop()
+        self._speculative_timers[user_id] = loop.call_later(
+            self.speculative_delay, self._start_speculative, user_id, resume_data, template)
+
+    def position(self, job: RenderJob) -> int:
+        """0 — документ уже рендериться; N — перед ним ще N задач у черзі."""
+        if job.started or job.future.done():
+            return 0
+        try:
+            return self._pending.index(job) + 1
+        except ValueError:
+            return 0
+
+    def cancel(self, user_id: Hashable) -> bool:
+        """Скасовує поточну задачу користувача (напр. після редагування даних)."""
+        self._cancel_timer(user_id)
+        speculative = self._speculative_jobs.pop(user_id, None)
+        if speculative:
+            self._cancel_job(speculative)
+
+        job = self._jobs.pop(user_id, None)
+        if job is None:
+            return False
+        self._cancel_job(job)
+        return True
+
+    def _cancel_job(self, job: RenderJob) -> None:
+        job.cancelled = True
+        if not job.started:
+            queue = self._speculative_pending if job.speculative else self._pending
+            queue.remove(job)
+        elif self.pool is not None and job.task is not None and not job.task.done():
+            # Пул вбиває процес рендеру і перезапускає слот; місце в черзі звільняється одразу
+            job.task.cancel()
+            self._release_slot(job)
+            self._pump()
+        # Потік стандартного executor'а не перервати — його результат буде відкинуто
+        if not job.future.done():
+            job.future.cancel()
+
+    def _cancel_timer(self, user_id: Hashable) -> None:
+        timer = self._speculative_timers.pop(user_id, None)
+        if timer:
+            timer.cancel()
+
+    def _start_speculative(self, user_id: Hashable, resume_data: ResumeData,
+                           template: Optional[TemplateSource] = None) -> None:
+        self._speculative_timers.pop(user_id, None)
+        data_hash = _render_hash(resume_data, template)
+        # Користувач уже генерує або результат і так у кеші
+        if user_id in self._jobs or user_id in self._speculative_jobs or data_hash in self.cache:
+            return
+
+        job = RenderJob(user_id, data_hash, resume_data, asyncio.get_running_loop().create_future(),
+                        waiters=0, speculative=True, template=template)
+        self._speculative_jobs[user_id] = job
+        self._speculative_pending.append(job)
+        self._pump()
+
+    def _count_speculative(self, data_hash: str, hit: bool) -> None:
+        if hit and data_hash in self._speculated_hashes:
+            self._speculated_hashes.discard(data_hash)
+            self.stats["speculative_hits"] += 1
+        elif not hit and self.speculative_delay is not None:
+            self.stats["speculative_misses"] += 1
+
+    def _report_stats(self) -> None:
+        """Статистика фонового рендеру в лог — не частіше ніж раз на STATS_REPORT_INTERVAL."""
+        if self.speculative_delay is None:
+            return
+        now = time.monotonic()
+        if now - self._stats_reported_at < STATS_REPORT_INTERVAL:
+            return
+        self._stats_reported_at = now
+        print(f"Speculative render hit rate: {self.hit_rate():.0%} ({self.stats})")
+
+    def hit_rate(self) -> float:
+        """Частка /generate, обслужених фоновим рендером (серед усіх, що потребували рендеру)."""
+        total = self.stats["speculative_hits"] + self.stats["speculative_misses"]
+        return self.stats["speculative_hits"] / total if total else 0.0
+
+    def _pump(self) -> None:
+        while self._running < self.max_workers and self._pending:
+            self._start(self._pending.popleft(), speculative=False)
+
+        # Фонові задачі — лише якщо користувачі не чекають
+        while (not self._pending and self._speculative_pending
+               and self._running < self.max_workers
+               and self._speculative_running < self.speculative_workers):
+            self.stats["speculative_started"] += 1
+            self._start(self._speculative_pending.popleft(), speculative=True)
+
+    def _start(self, job: RenderJob, speculative: bool) -> None:
+        job.started = True
+        job.speculative_slot = speculative
+        self._running += 1
+        if speculative:
+            self._speculative_running += 1
+        job.task = asyncio.get_running_loop().create_task(self._run(job))
+
+    def _release_slot(self, job: RenderJob) -> None:
+        if job.slot_released:
+            return
+        job.slot_released = True
+        self._running -= 1
+        if job.speculative_slot:
+            self._speculative_running -= 1
+
+    async def _run(self, job: RenderJob) -> None:
+        speculative = job.speculative_slot
+        try:
+            render_func = self.render_func
+            if job.template is not None:
+                # partial з модульною функцією і frozen dataclass серіалізується в процес рендеру
+                render_func = functools.partial(render_func, template=job.template)
+            if self.pool is not None:
+                result = await self.pool.run(render_func, job.resume_data)
+            else:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(None, render_func, job.resume_data)
+            # render_func повертає байти або PDFResult з метриками документа
+            pdf_bytes = getattr(result, "pdf_bytes", result)
+            if result is not pdf_bytes:
+                job.metrics = result
+            # Результат коректний для свого хешу, навіть якщо задачу скасовано
+            self.cache.put(job.data_hash, pdf_bytes)
+            if speculative and job.speculative:
+                self._speculated_hashes.add(job.data_hash)
+                if len(self._speculated_hashes) > self.cache.max_items:
+                    # Витіснені з кешу фонові результати вже не дадуть влучання
+                    self._speculated_hashes = {h for h in self._speculated_hashes if h in self.cache}
+            if not job.future.done():
+                job.future.set_result(pdf_bytes)
+        except Exception as e:
+            if job.speculative:
+                # Фонову помилку нікому отримати; /generate повторить рендер і покаже її
+                print(f"Speculative render failed: {e}")
+                if not job.future.done():
+                    job.future.cancel()
+            elif not job.future.done():
+                job.future.set_exception(e)
+        finally:
+            self._release_slot(job)
+            if self._jobs.get(job.user_id) is job:
+                del self._jobs[job.user_id]
+            if self._speculative_jobs.get(job.user_id) is job:
+                del self._speculative_jobs[job.user_id]
+            self._pump()
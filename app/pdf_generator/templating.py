@@ -0,0 +1,62 @@
+import hashlib
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+from jinja2 import Environment, FileSystemLoader
+from app.models.schemas import ResumeData
+from app.pdf_generator.images import photo_data_uri
+
+# Визначаємо шлях до поточного файлу (templating.py)
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Піднімаємося на два рівні вгору: app -> root
+# Потім заходимо в templates
+TEMPLATE_DIR = os.path.join(current_dir, '..', '..', 'templates')
+# Нормалізуємо шлях (прибираємо .., щоб він виглядав гарно)
+TEMPLATE_DIR = os.path.normpath(TEMPLATE_DIR)
+
+print(f"DEBUG: Шлях до шаблонів: {TEMPLATE_DIR}")
+
+# Створюємо середовище Jinja2
+jinja_env = Environment(loader=FileSystemLoader(TEMPLATE_DIR))
+
+DEFAULT_TEMPLATE = 'resume_template.html'
+
+
+@dataclass(frozen=True)
+class TemplateSource:
+    """Шаблон резюме: файл з TEMPLATE_DIR або HTML/CSS з таблиці templates.
+
+    Передається в процеси рендеру разом із даними, тому містить сам текст шаблону, а не id в БД.
+    """
+    name: str = DEFAULT_TEMPLATE
+    html: Optional[str] = None  # None -> файл `name` з TEMPLATE_DIR
+    css: Optional[str] = None
+
+    @property
+    def cache_key(self) -> str:
+        """Частина ключа кешу: зміна тексту шаблону дає новий ключ."""
+        if self.html is None:
+            return self.name
+        digest = hashlib.sha256(f"{self.html}\0{self.css or ''}".encode("utf-8")).hexdigest()[:16]
+        return f"{self.name}@{digest}"
+
+
+@lru_cache(maxsize=32)
+def _compile(html: str):
+    # Шаблони з БД компілюються один раз на процес
+    return jinja_env.from_string(html)
+
+
+def render_html(resume_data: ResumeData, template_name: str = DEFAULT_TEMPLATE,
+                template: Optional[TemplateSource] = None, **template_vars) -> str:
+    """Рендерить шаблон з даними резюме (без WeasyPrint). `template` має пріоритет над `template_name`."""
+    if template is not None and template.html is not None:
+        jinja_template = _compile(template.html)
+        template_vars.setdefault("css", template.css)
+    else:
+        jinja_template = jinja_env.get_template(template.name if template is not None else template_name)
+    photo_id = resume_data.personal.photo_id
+    photo = photo_data_uri(photo_id) if photo_id else None
+    return jinja_template.render(data=resume_data.model_dump(), photo=photo, **template_vars)
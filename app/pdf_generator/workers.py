@@ -0,0 +1,105 @@
+"""Пул процесів для рендеру PDF з лімітами ресурсів.
+
+Кожен слот — окремий однопроцесний ProcessPoolExecutor. Якщо рендер перевищив
+ліміт часу або пам'яті, вбивається і перезапускається лише процес цього слоту,
+інші рендери продовжуються.
+"""
+import asyncio
+import importlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows: ліміт пам'яті недоступний
+    resource = None
+
+
+class RenderLimitError(Exception):
+    """Рендер перевищив ліміт часу або пам'яті."""
+
+
+class RenderWorkerInitError(Exception):
+    """Процес рендеру не ініціалізувався (ліміт пам'яті, імпорт WeasyPrint тощо)."""
+
+
+# Помилка ініціалізації цього процесу: повідомляється з кожною задачею, а не як
+# BrokenProcessPool, який не відрізнити від аварії через ліміт пам'яті
+_init_error: Optional[str] = None
+
+
+def _init_worker(memory_limit_bytes: Optional[int], warmup_modules: Tuple[str, ...]) -> None:
+    global _init_error
+    try:
+        if memory_limit_bytes and resource is not None:
+            resource.setrlimit(resource.RLIMIT_AS, (memory_limit_bytes, memory_limit_bytes))
+        # Прогріваємо WeasyPrint один раз на процес, а не на кожен рендер
+        for module_name in warmup_modules:
+            importlib.import_module(module_name)
+    except Exception as e:
+        _init_error = f"{type(e).__name__}: {e}"
+
+
+def _call(func: Callable, *args):
+    if _init_error is not None:
+        raise RenderWorkerInitError(f"Процес генерації не запустився: {_init_error}")
+    return func(*args)
+
+
+class RenderWorkerPool:
+    def __init__(self, size: int = 2, timeout: float = 20.0, memory_limit_mb: Optional[int] = 512,
+                 max_tasks_per_child: Optional[int] = 50,
+                 warmup_modules: Tuple[str, ...] = ("weasyprint", "app.pdf_generator.generator")):
+        self.size = size
+        self.timeout = timeout
+        self.memory_limit_bytes = memory_limit_mb * 1024 * 1024 if memory_limit_mb else None
+        self.max_tasks_per_child = max_tasks_per_child
+        self.warmup_modules = tuple(warmup_modules)
+        self.recycled = 0
+        self._free: asyncio.Queue = asyncio.Queue()
+        for _ in range(size):
+            self._free.put_nowait(self._new_executor())
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # spawn: чистий процес без копії потоків/циклу подій бота
+        return ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.memory_limit_bytes, self.warmup_modules),
+            max_tasks_per_child=self.max_tasks_per_child,
+        )
+
+    def _recycle(self, executor: ProcessPoolExecutor) -> ProcessPoolExecutor:
+        # Публічного способу вбити зависший процес у ProcessPoolExecutor немає (до 3.14)
+        for process in list((executor._processes or {}).values()):
+            process.kill()
+        executor.shutdown(wait=False, cancel_futures=True)
+        self.recycled += 1
+        return self._new_executor()
+
+    async def run(self, func: Callable, *args):
+        """Виконує func(*args) у вільному процесі з лімітом часу та пам'яті."""
+        loop = asyncio.get_running_loop()
+        executor = await self._free.get()
+        try:
+            future = loop.run_in_executor(executor, _call, func, *args)
+            return await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            executor = self._recycle(executor)
+            raise RenderLimitError(f"Генерація перевищила ліміт часу ({self.timeout:.0f} с)")
+        except (MemoryError, BrokenProcessPool):
+            executor = self._recycle(executor)
+            raise RenderLimitError("Процес генерації завершився аварійно (ймовірно, перевищено ліміт пам'яті)")
+        except asyncio.CancelledError:
+            # Рендер більше не потрібен (дані змінилися): вбиваємо процес, а не чекаємо на нього
+            executor = self._recycle(executor)
+            raise
+        finally:
+            self._free.put_nowait(executor)
+
+    def shutdown(self) -> None:
+        while not self._free.empty():
+            self._free.get_nowait().shutdown(wait=False, cancel_futures=True)
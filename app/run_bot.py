@@ -2,28 +2,34 @@ import os
 import threading
 from dotenv import load_dotenv
 from telegram.ext import Application, CommandHandler, MessageHandler, filters
+from app.core import config
 from app.core.database import init_db
+from app.bot.tenants import run_from_config
+from app.bot.admission import guard, COST_TEXT, COST_COMMAND, COST_EXPORT, COST_PHOTO, COST_RENDER
 # 1. ПЕРЕВІРТЕ ІМПОРТИ ТУТ
-from app.bot.handlers import start_command, generate_command, message_handler, add_experience_command, \
-    add_education_command
+from app.bot.handlers import start_command, generate_command, message_handler, SECTION_COMMANDS, EXPORT_COMMANDS, \
+    add_photo_command, photo_handler
 
 load_dotenv()
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 
 
 def init_telegram_bot_handlers(application: Application):
-    application.add_handler(CommandHandler("start", start_command))
-    application.add_handler(CommandHandler("generate", generate_command))
-    application.add_handler(CommandHandler("add_experience", add_experience_command))
+    application.add_handler(CommandHandler("start", guard(start_command, COST_COMMAND)))
+    application.add_handler(CommandHandler("generate", guard(generate_command, COST_RENDER, render=True)))
+    for command, handler in SECTION_COMMANDS.items():
+        application.add_handler(CommandHandler(command, guard(handler, COST_COMMAND)))
+    # /export_html, /export_md, /export_txt (без PDF-верстки)
+    for command, handler in EXPORT_COMMANDS.items():
+        application.add_handler(CommandHandler(command, guard(handler, COST_EXPORT)))
+    application.add_handler(CommandHandler("add_photo", guard(add_photo_command, COST_COMMAND)))
 
-    # 2. ПЕРЕВІРТЕ, ЧИ Є ЦЕЙ РЯДОК:
-    application.add_handler(CommandHandler("add_education", add_education_command))
-
-    application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, message_handler))
+    application.add_handler(MessageHandler(filters.PHOTO, guard(photo_handler, COST_PHOTO)))
+    application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, guard(message_handler, COST_TEXT)))
 
 
 def main():
-    if not TELEGRAM_BOT_TOKEN:
+    if not TELEGRAM_BOT_TOKEN and not config.TENANTS_CONFIG:
         print("Помилка: Токен Telegram-бота не знайдено.")
         return
 
@@ -31,6 +37,11 @@ def main():
     init_db()
     print("База даних ініціалізована.")
 
+    if config.TENANTS_CONFIG:
+        # Кілька ботів в одному процесі зі спільними пулами рендеру та БД
+        run_from_config(config.TENANTS_CONFIG, init_telegram_bot_handlers)
+        return
+
     application = Application.builder().token(TELEGRAM_BOT_TOKEN).build()
     init_telegram_bot_handlers(application)
 
@@ -0,0 +1,45 @@
+"""Бенчмарк рушія діалогу без БД і Telegram.
+
+Запуск: python -m benchmarks.bench_dialog
+"""
+import time
+
+from app.logic import dialog
+from app.logic.session_manager import STEP_WAITING_NAME, STEP_IDLE
+
+# Повний сценарій: онбординг + по одному елементу кожної секції
+SCRIPT = [
+    (None, STEP_WAITING_NAME, "Тарас Шевченко"),
+    (None, None, "taras@example.com, +380001112233"),
+    (None, None, "Backend-розробник з 5 роками досвіду."),
+]
+for _name, _section in dialog.SECTIONS.items():
+    SCRIPT.append((_name, None, None))
+    for _field in _section.fields:
+        SCRIPT.append((None, None, f"{_field.key} value"))
+
+
+def run_script() -> dict:
+    context, step = {}, STEP_WAITING_NAME
+    for section_name, forced_step, text in SCRIPT:
+        if section_name:
+            transition = dialog.begin_section(context, section_name)
+        else:
+            transition = dialog.advance(context, forced_step or step, text)
+        context, step = transition.context, transition.next_step
+    assert step == STEP_IDLE
+    return context
+
+
+def main(iterations: int = 2000):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        run_script()
+    elapsed = time.perf_counter() - start
+    transitions = iterations * len(SCRIPT)
+    print(f"{transitions} переходів за {elapsed:.3f} с "
+          f"({elapsed / transitions * 1e6:.1f} мкс/перехід)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""Велике резюме: посекційна верстка проти верстки одним проходом.
+
+Окрім часу перевіряє калібрування PDF_CHUNK_BUDGET: посекційна верстка має дати
+стільки ж сторінок, скільки й один прохід (інакше частина переповнює сторінку або
+лишає її напівпорожньою).
+
+Запуск: python -m benchmarks.bench_large_document
+"""
+from weasyprint import HTML
+
+from app.pdf_generator.chunking import layout_cost
+from app.pdf_generator.generator import render_html_parts, render_pdf
+from benchmarks.sample_data import make_resume
+
+
+def count_pages(resume, chunked: bool) -> int:
+    return sum(len(HTML(string=part).render().pages) for part in render_html_parts(resume, chunked))
+
+
+def main(repeats: int = 3):
+    mismatches = []
+    for jobs, bullets, bullet_text in ((5, 8, 1), (20, 8, 1), (40, 8, 1), (20, 4, 4), (40, 6, 3)):
+        resume = make_resume(jobs=jobs, bullets=bullets, skills=40, bullet_text=bullet_text)
+        timings = {}
+        for chunked in (False, True):
+            runs = [render_pdf(resume, "standard", chunked=chunked) for _ in range(repeats)]
+            timings[chunked] = min(r.render_seconds for r in runs)
+        pages = {chunked: count_pages(resume, chunked) for chunked in (False, True)}
+        print(f"jobs={jobs:>3} пунктів={bullets} x{bullet_text} вага={layout_cost(resume):>6.1f}: "
+              f"один прохід {timings[False] * 1000:.0f} мс / {pages[False]} стор., "
+              f"частинами {timings[True] * 1000:.0f} мс / {pages[True]} стор. "
+              f"(x{timings[False] / timings[True]:.2f})")
+        if pages[False] != pages[True]:
+            mismatches.append(f"jobs={jobs}, пунктів={bullets} x{bullet_text}: {pages[False]} != {pages[True]}")
+
+    if mismatches:
+        raise SystemExit("Кількість сторінок відрізняється, відкалібруйте PDF_CHUNK_BUDGET:\n"
+                         + "\n".join(mismatches))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Порівняння профілів PDF: розмір файлу та час рендеру.
+
+Профілі відрізняються лише обробкою зображень, тому резюме порівнюється і без фото,
+і з фото (похідна з шумом, що погано стискається, як справжня світлина).
+
+Запуск: python -m benchmarks.bench_pdf_profiles
+"""
+import io
+import os
+
+from app.pdf_generator import images
+from app.pdf_generator.generator import PDF_PROFILES, render_pdf
+from benchmarks.sample_data import make_resume
+
+BENCH_PHOTO_ID = "bench_photo"
+
+
+def make_photo() -> str:
+    """Зберігає похідну тестового фото в кеші і повертає її file_unique_id."""
+    from PIL import Image
+
+    width, height = 1200, 1500
+    source = Image.frombytes("RGB", (width, height), os.urandom(width * height * 3))
+    raw = io.BytesIO()
+    source.save(raw, format="JPEG", quality=95)
+    images.save_derivative(BENCH_PHOTO_ID, images.process_photo(raw.getvalue()))
+    return BENCH_PHOTO_ID
+
+
+def compare(title: str, resume, repeats: int) -> None:
+    results = {}
+    for profile in PDF_PROFILES:
+        runs = [render_pdf(resume, profile) for _ in range(repeats)]
+        results[profile] = (runs[-1].size_bytes, min(r.render_seconds for r in runs))
+
+    print(title)
+    base_size, base_time = results["standard"]
+    for profile, (size, seconds) in results.items():
+        print(f"{profile:>10}: {size:>8} байт ({base_size - size:+d} збережено), "
+              f"{seconds * 1000:.0f} мс ({(seconds - base_time) * 1000:+.0f} мс)")
+
+
+def main(repeats: int = 3):
+    resume = make_resume()
+    compare("Без фото:", resume, repeats)
+    personal = resume.personal.model_copy(update={"photo_id": make_photo()})
+    compare("З фото:", resume.model_copy(update={"personal": personal}), repeats)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""Швидкість пошуку по індексу на великій кількості резюме (SQLite FTS5 у пам'яті).
+
+Запуск: python -m benchmarks.bench_search [кількість]
+"""
+import random
+import sys
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.logic import search
+
+SKILLS = ["Python", "Java", "Go", "Rust", "SQL", "Django", "React", "Docker", "Kubernetes", "Figma",
+          "English B2", "AWS", "Terraform", "Kotlin", "Swift"]
+ROLES = ["Backend Engineer", "Frontend Developer", "Data Scientist", "DevOps", "Designer", "QA Engineer"]
+
+
+def main(count: int = 200_000):
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    rng = random.Random(42)
+
+    start = time.perf_counter()
+    for user_id in range(1, count + 1):
+        context = {
+            "personal": {"full_name": f"User {user_id}"},
+            "skills": rng.sample(SKILLS, 5),
+            "experience": [{"job_title": rng.choice(ROLES), "company": f"Company {rng.randint(1, 5000)}",
+                            "description": ["Розробка сервісів і підтримка інфраструктури"]}],
+        }
+        search.index_document(db, user_id, search.build_search_document(context))
+    db.commit()
+    print(f"Індексація {count} резюме: {time.perf_counter() - start:.1f} с")
+
+    for query, skills in [("python", []), ("backend", ["docker"]), ("rust kubernetes", []), ("", ["swift", "aws"])]:
+        start = time.perf_counter()
+        hits = search.search(db, query, skills, limit=20)
+        print(f"{query!r:>20} skills={skills}: {len(hits)} результатів за "
+              f"{(time.perf_counter() - start) * 1000:.1f} мс")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,29 @@
+"""Тестові дані резюме для бенчмарків."""
+from app.models.schemas import ResumeData
+
+BULLET_TEXT = "розробка та підтримка API, код-рев'ю, менторство."
+
+
+def make_resume(jobs: int = 3, bullets: int = 3, skills: int = 10, bullet_text: int = 1) -> ResumeData:
+    """bullet_text — у скільки разів довший текст кожного пункту (перенос на кілька рядків)."""
+    return ResumeData(
+        personal={
+            "full_name": "Тарас Шевченко",
+            "email": "taras@example.com",
+            "phone": "+380001112233",
+            "summary": "Backend-розробник з досвідом побудови високонавантажених сервісів. " * 3,
+        },
+        experience=[
+            {
+                "job_title": f"Senior Developer {i}",
+                "company": f"Компанія {i}",
+                "start_date": f"{2010 + i}",
+                "end_date": f"{2011 + i}",
+                "description": [f"Обов'язок {j}: " + " ".join([BULLET_TEXT] * bullet_text)
+                                for j in range(bullets)],
+            }
+            for i in range(jobs)
+        ],
+        education=[{"degree": "Магістр", "institution": "КНУ", "year_finished": "2010", "city": "Київ"}],
+        skills=[f"Skill {i}" for i in range(skills)],
+    )
@@ -0,0 +1,39 @@
+from app.bot.admission import AdmissionController, COST_RENDER, COST_TEXT
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_user_bucket_weights_commands_and_refills():
+    """Рендер списує більше токенів, ніж текст; після очікування ліміт відновлюється"""
+    clock = FakeClock()
+    controller = AdmissionController(user_capacity=20, user_refill_per_second=1,
+                                     render_budget_per_minute=600, render_burst=100, clock=clock)
+
+    assert controller.admit(1, COST_RENDER) == 0
+    assert controller.admit(1, COST_RENDER) == 0
+    wait = controller.admit(1, COST_RENDER)
+    assert wait == 10
+    # Інший користувач не страждає
+    assert controller.admit(2, COST_TEXT) == 0
+
+    clock.now += wait
+    assert controller.admit(1, COST_RENDER) == 0
+
+
+def test_global_render_budget_is_shared_and_notification_sent_once():
+    """Глобальний бюджет рендерів спільний; відмова повідомляється один раз"""
+    clock = FakeClock()
+    controller = AdmissionController(render_budget_per_minute=60, render_burst=1, clock=clock)
+
+    assert controller.admit(1, COST_RENDER) == 0 and controller.admit_render() == 0
+    assert controller.admit(2, COST_RENDER) == 0
+    wait = controller.admit_render()
+    assert wait == 1
+    assert controller.should_notify(2, wait)
+    assert not controller.should_notify(2, wait)
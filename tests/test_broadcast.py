@@ -0,0 +1,122 @@
+import asyncio
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from telegram.error import Forbidden, RetryAfter
+from app.core.database import Base, upgrade_schema
+from app.admin.broadcast import create_broadcast, run_broadcast
+from app.logic import session_manager
+from app.models.orm import User, UserTenant
+
+
+def _users(db, count):
+    for tg_id in range(1, count + 1):
+        session_manager.get_or_create_user(db, tg_id, {})
+
+
+def test_broadcast_marks_blocked_and_retries_after_flood_limit(db_session):
+    """Forbidden позначає користувача заблокованим, RetryAfter — повтор без втрати повідомлення"""
+    _users(db_session, 6)
+    sent, flooded = [], []
+
+    async def send(chat_id, text):
+        if chat_id == 3:
+            raise Forbidden("bot was blocked by the user")
+        if chat_id == 5 and not flooded:
+            flooded.append(chat_id)
+            raise RetryAfter(0)
+        sent.append(chat_id)
+
+    broadcast = create_broadcast(db_session, "Нові шаблони")
+    report = asyncio.run(run_broadcast(db_session, broadcast.id, send, rate=1000, concurrency=3,
+                                       batch_size=4, log=lambda m: None))
+
+    assert sorted(sent) == [1, 2, 4, 5, 6]
+    assert (report.status, report.delivered, report.failed, report.blocked) == ("done", 5, 0, 1)
+    assert db_session.query(User).filter(User.is_blocked.is_(True)).one().telegram_id == 3
+
+    # Наступна розсилка пропускає заблокованого, доки він знову не напише боту
+    sent.clear()
+    second = create_broadcast(db_session, "Ще новина")
+    asyncio.run(run_broadcast(db_session, second.id, send, rate=1000, log=lambda m: None))
+    assert sorted(sent) == [1, 2, 4, 5, 6]
+    assert not session_manager.get_or_create_user(db_session, 3, {}).is_blocked
+
+
+def test_broadcast_resumes_from_checkpoint(db_session):
+    """Після падіння розсилка продовжується з останньої контрольної точки"""
+    _users(db_session, 5)
+    sent = []
+
+    async def crashing_send(chat_id, text):
+        if chat_id == 4:
+            raise KeyboardInterrupt  # імітація падіння процесу посеред батчу
+        sent.append(chat_id)
+
+    broadcast = create_broadcast(db_session, "Нові шаблони")
+    with pytest.raises(KeyboardInterrupt):
+        asyncio.run(run_broadcast(db_session, broadcast.id, crashing_send, rate=1000, concurrency=1,
+                                  batch_size=2, log=lambda m: None))
+    db_session.rollback()
+    assert broadcast.last_user_id == 2 and broadcast.status == "running"
+
+    async def send(chat_id, text):
+        sent.append(chat_id)
+
+    report = asyncio.run(run_broadcast(db_session, broadcast.id, send, rate=1000, batch_size=2,
+                                       log=lambda m: None))
+    # Незавершений батч (3, 4) надсилається повторно, попередні — ні
+    assert sent == [1, 2, 3, 3, 4, 5]
+    assert report.delivered == 5 and report.sent_this_run == 3
+
+
+def test_upgrade_schema_adds_is_blocked_to_existing_users_table(tmp_path):
+    """База зі старою схемою users (без is_blocked) продовжує працювати після init_db"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE users (id INTEGER NOT NULL PRIMARY KEY, telegram_id BIGINT NOT NULL UNIQUE, "
+            "first_name VARCHAR, last_name VARCHAR, username VARCHAR, created_at DATETIME, last_active_at DATETIME)"))
+        connection.execute(text("INSERT INTO users (id, telegram_id, first_name) VALUES (1, 42, 'Old')"))
+
+    Base.metadata.create_all(engine)
+    upgrade_schema(engine)
+    upgrade_schema(engine)  # повторний запуск нічого не змінює
+
+    db = sessionmaker(bind=engine)()
+    try:
+        user = session_manager.get_or_create_user(db, 42, {})
+        assert user.first_name == "Old" and user.is_blocked is False
+    finally:
+        db.close()
+
+
+def test_tenant_broadcast_reaches_only_users_of_that_bot(db_session):
+    """Розсилка бота йде лише його користувачам; блокування одного бота не зачіпає інших"""
+    for tg_id in (1, 2, 3):
+        session_manager.get_or_create_user(db_session, tg_id, {}, tenant="main")
+    for tg_id in (3, 4):
+        session_manager.get_or_create_user(db_session, tg_id, {}, tenant="it_cv")
+    sent = []
+
+    async def send(chat_id, text):
+        if chat_id == 3:
+            raise Forbidden("bot was blocked by the user")
+        sent.append(chat_id)
+
+    broadcast = create_broadcast(db_session, "New templates!", tenant="it_cv")
+    report = asyncio.run(run_broadcast(db_session, broadcast.id, send, rate=1000, log=lambda m: None))
+
+    assert sent == [4]
+    assert (report.delivered, report.blocked) == (1, 1)
+    blocked = db_session.query(UserTenant).filter(UserTenant.is_blocked.is_(True)).one()
+    assert blocked.tenant == "it_cv"
+    assert db_session.query(User).filter(User.is_blocked.is_(True)).count() == 0
+
+    # Повідомлення іншому боту не розблоковує it_cv
+    session_manager.get_or_create_user(db_session, 3, {}, tenant="main")
+    db_session.refresh(blocked)
+    assert blocked.is_blocked
+    session_manager.get_or_create_user(db_session, 3, {}, tenant="it_cv")
+    db_session.refresh(blocked)
+    assert not blocked.is_blocked
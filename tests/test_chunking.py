@@ -0,0 +1,64 @@
+from app.models.schemas import ResumeData
+from app.pdf_generator.chunking import CONTINUED_ITEM, chunk_resume_data, layout_cost, split_into_chunks
+from app.pdf_generator.templating import render_html
+
+# Приблизно сторінка A4 (config.PDF_CHUNK_BUDGET)
+CHUNK_BUDGET = 42
+
+
+def make_large_resume(jobs):
+    return ResumeData(
+        personal={"full_name": "Test User"},
+        experience=[
+            {"job_title": f"Dev {i}", "company": f"Company {i}", "start_date": "2020",
+             "description": ["task"] * 5}
+            for i in range(jobs)
+        ],
+        skills=["Python", "SQL"],
+    )
+
+
+def test_large_resume_is_split_without_losing_items():
+    """Усі елементи потрапляють у частини по порядку, заголовок секції — лише раз"""
+    resume = make_large_resume(20)
+    chunks = split_into_chunks(resume, chunk_budget=30)
+
+    assert len(chunks) > 1
+    jobs = [item.job_title for chunk in chunks for item in chunk.sections.get("experience", [])]
+    assert jobs == [f"Dev {i}" for i in range(20)]
+    assert "experience" not in chunks[0].continued
+    assert all("experience" in chunk.continued for chunk in chunks[1:] if "experience" in chunk.sections)
+
+    html = render_html(chunk_resume_data(resume, chunks[1]), body_only=True, continued=chunks[1].continued)
+    assert "<h1>" not in html
+    assert "Досвід роботи" not in html
+
+
+def test_chunk_cost_counts_wrapped_lines():
+    """Довгі пункти опису переносяться на кілька рядків і дають більше частин"""
+    short = make_large_resume(10)
+    long = short.model_copy(update={"experience": [
+        item.model_copy(update={"description": ["task " * 100] * 5}) for item in short.experience]})
+
+    assert layout_cost(long) > layout_cost(short)
+    assert len(split_into_chunks(long, CHUNK_BUDGET)) > len(split_into_chunks(short, CHUNK_BUDGET))
+
+
+def test_long_experience_item_is_split_between_chunks():
+    """Запис, що не вміщується на сторінку, ділиться по пунктах, як при верстці одним проходом"""
+    resume = ResumeData(personal={"full_name": "Test User"}, experience=[
+        {"job_title": "Dev", "company": "Company", "start_date": "2020",
+         "description": [f"task {i} " + "x" * 100 for i in range(20)]},
+        {"job_title": "Lead", "company": "Company", "start_date": "2022",
+         "description": [f"duty {i}" for i in range(20)]},
+    ])
+    chunks = split_into_chunks(resume, CHUNK_BUDGET)
+
+    assert all(chunk.cost <= CHUNK_BUDGET for chunk in chunks)
+    bullets = [line for chunk in chunks for item in chunk.sections["experience"] for line in item.description]
+    assert bullets == [f"task {i} " + "x" * 100 for i in range(20)] + [f"duty {i}" for i in range(20)]
+    assert CONTINUED_ITEM in chunks[1].continued
+
+    html = render_html(chunk_resume_data(resume, chunks[1]), body_only=True, continued=chunks[1].continued)
+    first_title = chunks[1].sections["experience"][0].job_title
+    assert f'<span class="job-title">{first_title}</span>' not in html
@@ -0,0 +1,60 @@
+from app.logic import dialog
+from app.logic.session_manager import (
+    STEP_IDLE, STEP_WAITING_NAME, STEP_WAITING_CONTACTS, STEP_WAITING_SUMMARY,
+    STEP_WAITING_EXP_COMPANY, STEP_WAITING_EXP_DESC,
+)
+
+
+def test_contacts_step_merges_into_personal():
+    """Крок контактів зливає поля у personal, не стираючи ім'я"""
+    context = {"personal": {"full_name": "Test User"}}
+    transition = dialog.advance(context, STEP_WAITING_CONTACTS, "a@b.com, +380")
+
+    assert transition.context["personal"] == {"full_name": "Test User", "email": "a@b.com", "phone": "+380"}
+    assert transition.next_step == STEP_WAITING_SUMMARY
+    # Вхідний контекст не змінюється
+    assert "email" not in context["personal"]
+
+
+def test_experience_section_is_finalized_in_one_transition():
+    """Останній крок секції переносить буфер у список"""
+    transition = dialog.begin_section({}, "experience")
+    assert transition.next_step == STEP_WAITING_EXP_COMPANY
+
+    context, step = transition.context, transition.next_step
+    for text in ["Google", "Senior Dev", "2020-2024", "Backend development"]:
+        transition = dialog.advance(context, step, text)
+        context, step = transition.context, transition.next_step
+
+    assert step == STEP_IDLE
+    assert context["experience"][0]["company"] == "Google"
+    assert context["experience"][0]["description"] == ["Backend development"]
+    assert "temp_experience" not in context
+
+
+def test_every_section_step_is_registered():
+    """Кожне поле кожної секції має крок у таблиці переходів"""
+    for section in dialog.SECTIONS.values():
+        for field in section.fields:
+            assert dialog.STEPS[field.step].path == (section.temp_key, field.key)
+    assert dialog.STEPS[STEP_WAITING_EXP_DESC].finalizer is not None
+
+
+def test_too_long_input_is_rejected_without_changing_step():
+    """Задовгий текст не записується в контекст, крок не змінюється"""
+    transition = dialog.advance({}, STEP_WAITING_EXP_COMPANY, "x" * 10_000)
+
+    assert transition.next_step == STEP_WAITING_EXP_COMPANY
+    assert "temp_experience" not in transition.context
+
+
+def test_invalid_name_is_rejected_without_changing_step():
+    """Валідатор кроку: закоротке ім'я не записується, користувач лишається на кроці"""
+    transition = dialog.advance({}, STEP_WAITING_NAME, " A ")
+    assert transition.next_step == STEP_WAITING_NAME
+    assert transition.context == {}
+    assert "мінімум" in transition.reply
+
+    transition = dialog.advance({}, STEP_WAITING_NAME, "Іван Петренко")
+    assert transition.next_step == STEP_WAITING_CONTACTS
+    assert transition.context["personal"]["full_name"] == "Іван Петренко"
@@ -0,0 +1,62 @@
+import gzip
+import json
+import pytest
+from app.admin.export_data import export_table
+from app.logic import session_manager
+from app.models.orm import User
+
+
+def test_export_sessions_to_gzipped_jsonl(db_session, tmp_path):
+    """Сесії експортуються батчами з валідацією через ResumeData"""
+    for tg_id in range(5):
+        user = session_manager.get_or_create_user(db_session, tg_id, {})
+        session_manager.update_session_context(db_session, user.id, {"personal": {"full_name": f"User {tg_id}"}})
+    # Невалідні дані не зупиняють експорт
+    session_manager.update_session_context(db_session, user.id, {"skills": [{"bad": "item"}]})
+
+    path = tmp_path / "sessions.jsonl.gz"
+    rows = export_table(db_session, "sessions", str(path), "jsonl", "gzip", batch_size=2, log=lambda m: None)
+
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert rows == len(records) == 5
+    assert records[0]["resume"]["personal"]["full_name"] == "User 0"
+    assert records[-1]["resume"] is None and records[-1]["validation_error"]
+
+
+def test_export_sessions_to_parquet_with_late_non_null_columns(db_session, tmp_path):
+    """Колонки, порожні в першому батчі (validation_error), не ламають схему parquet"""
+    pq = pytest.importorskip("pyarrow.parquet")
+    for tg_id in range(4):
+        user = session_manager.get_or_create_user(db_session, tg_id, {"first_name": f"User {tg_id}"})
+        session_manager.update_session_context(db_session, user.id, {"personal": {"full_name": f"User {tg_id}"}})
+    # Невалідні дані лише в останньому батчі
+    session_manager.update_session_context(db_session, user.id, {"skills": [{"bad": "item"}]})
+    db_session.query(User).filter(User.telegram_id == 3).update({"username": "late", "is_blocked": True})
+    db_session.commit()
+
+    sessions_path = tmp_path / "sessions.parquet"
+    export_table(db_session, "sessions", str(sessions_path), "parquet", batch_size=2, log=lambda m: None)
+    sessions = pq.read_table(sessions_path).to_pylist()
+    assert [bool(s["validation_error"]) for s in sessions] == [False, False, False, True]
+
+    users_path = tmp_path / "users.parquet"
+    export_table(db_session, "users", str(users_path), "parquet", batch_size=2, log=lambda m: None)
+    users = pq.read_table(users_path).to_pylist()
+    assert users[-1]["username"] == "late" and users[-1]["is_blocked"] is True
+
+
+def test_export_keeps_oversized_legacy_data_intact(db_session, tmp_path):
+    """Експорт не обрізає застарілі завеликі дані, а повідомляє про перевищення лімітів"""
+    user = session_manager.get_or_create_user(db_session, 1, {})
+    session_manager.update_session_context(db_session, user.id, {
+        "personal": {"full_name": "Іван", "summary": "x" * 5000},
+        "skills": [f"skill {i}" for i in range(150)],
+    })
+
+    path = tmp_path / "sessions.jsonl"
+    export_table(db_session, "sessions", str(path), "jsonl", batch_size=2, log=lambda m: None)
+
+    record = json.loads(path.read_text(encoding="utf-8"))
+    assert record["resume"] is None
+    assert "summary" in record["validation_error"] and "skills" in record["validation_error"]
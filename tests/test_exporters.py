@@ -0,0 +1,23 @@
+from app.models.schemas import ResumeData
+from app.pdf_generator.cache import ContentCache
+from app.pdf_generator.exporters import export_resume
+
+
+def test_markdown_export_contains_sections_and_is_cached():
+    """Markdown-експорт містить дані резюме і повторно береться з кешу"""
+    resume = ResumeData(
+        personal={"full_name": "Test User", "email": "a@b.com"},
+        skills=["Python", "SQL"],
+    )
+    cache = ContentCache()
+
+    first = export_resume(resume, "md", cache=cache)
+    second = export_resume(resume, "md", cache=cache)
+
+    text = first.decode("utf-8")
+    assert text.startswith("# Test User")
+    assert "Python, SQL" in text
+    assert second is first
+    assert cache.hits == 1
+    # Інший формат — інший ключ кешу
+    assert export_resume(resume, "txt", cache=cache) != first
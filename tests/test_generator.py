@@ -0,0 +1,59 @@
+import pytest
+from app.logic import session_manager
+from app.models.orm import RenderMetric
+from app.models.schemas import ResumeData
+from app.pdf_generator import generator
+from app.pdf_generator.generator import PDFResult, render_pdf
+from app.pdf_generator.templating import TemplateSource
+
+
+@pytest.fixture
+def fake_write_pdf(monkeypatch):
+    """Підміна верстки WeasyPrint: compact-профіль дає файл учетверо менший"""
+    calls = []
+
+    def write_pdf(html_parts, profile):
+        calls.append(profile)
+        size = 400_000 if profile == "standard" else 100_000
+        return PDFResult(b"%PDF", profile, size, 0.5)
+
+    monkeypatch.setattr(generator, "_write_pdf", write_pdf)
+    return calls
+
+
+def test_auto_profile_falls_back_to_compact_over_budget(fake_write_pdf):
+    """auto: документ понад бюджет перегенеровується компактно, час рендеру сумується"""
+    resume = ResumeData(personal={"full_name": "Test User", "photo_id": "photo"})
+
+    result = render_pdf(resume, "auto", size_budget=300_000)
+    assert fake_write_pdf == ["standard", "compact"]
+    assert (result.profile, result.size_bytes, result.render_seconds) == ("compact", 100_000, 1.0)
+
+    fake_write_pdf.clear()
+    result = render_pdf(resume, "auto", size_budget=500_000)
+    assert fake_write_pdf == ["standard"] and result.profile == "standard"
+
+
+def test_auto_profile_skips_compact_without_photo(fake_write_pdf):
+    """Без фото compact дав би той самий файл — повторного рендеру немає"""
+    result = render_pdf(ResumeData(personal={"full_name": "Test User"}), "auto", size_budget=300_000)
+    assert fake_write_pdf == ["standard"] and result.profile == "standard"
+
+
+def test_render_metrics_are_recorded_per_document(db_session):
+    """Розмір і профіль кожного документа зберігаються в render_metrics"""
+    user = session_manager.get_or_create_user(db_session, 1, {})
+    session_manager.save_render_metrics(db_session, user.id, "compact", 100_000, 1.0)
+    metric = db_session.query(RenderMetric).one()
+    assert (metric.user_id, metric.profile, metric.size_bytes) == (user.id, "compact", 100_000)
+
+
+def test_db_template_is_never_chunked(monkeypatch):
+    """Шаблон з БД не підтримує body_only/continued — документ верстається однією частиною"""
+    parts = []
+    monkeypatch.setattr(generator, "_write_pdf",
+                        lambda html_parts, profile: parts.extend(html_parts) or PDFResult(b"%PDF", profile, 4, 0.1))
+    template = TemplateSource("brand", html="<h1>{{ data.personal.full_name }}</h1>")
+
+    render_pdf(ResumeData(personal={"full_name": "Test User"}), "standard", chunked=True, template=template)
+    assert parts == ["<h1>Test User</h1>"]
@@ -0,0 +1,132 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+import pytest
+from sqlalchemy.orm import sessionmaker
+from app.bot import handlers
+from app.bot.admission import AdmissionController
+from app.logic import session_manager
+from app.models.orm import RenderMetric
+from app.pdf_generator import images
+from app.pdf_generator.generator import PDFResult
+from app.pdf_generator.jobs import RenderQueue
+
+
+class FakeBot:
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.sent.append((chat_id, text))
+
+    async def send_document(self, chat_id, document, **kwargs):
+        self.sent.append((chat_id, document))
+
+    async def get_file(self, file_id):
+        async def download_as_bytearray():
+            return bytearray(b"raw photo")
+        return SimpleNamespace(download_as_bytearray=download_as_bytearray)
+
+
+@pytest.fixture
+def bot_env(db_session, monkeypatch):
+    """Обробники працюють з тестовою БД і чергою із заглушкою рендеру замість WeasyPrint"""
+    release = threading.Event()
+
+    def render(resume_data):
+        release.wait(timeout=5)
+        return PDFResult(b"%PDF", "standard", 4, 0.1)
+
+    SessionLocal = sessionmaker(bind=db_session.get_bind())
+    monkeypatch.setattr(handlers, "get_db", SessionLocal)
+    monkeypatch.setattr(handlers, "render_queue", RenderQueue(render, max_workers=1))
+    monkeypatch.setattr(handlers, "admission", AdmissionController())
+    for tg_id in (1, 2):
+        user = session_manager.get_or_create_user(db_session, tg_id, {"first_name": f"User{tg_id}"})
+        session_manager.update_session_context(db_session, user.id, {"personal": {"full_name": f"User {tg_id}"}})
+
+    bot = FakeBot()
+    context = SimpleNamespace(bot=bot, bot_data={})
+    return SimpleNamespace(bot=bot, context=context, release=release)
+
+
+def make_update(tg_id):
+    return SimpleNamespace(effective_user=SimpleNamespace(id=tg_id), effective_chat=SimpleNamespace(id=tg_id))
+
+
+def test_generate_attaches_repeat_and_reports_queue_position(bot_env, db_session):
+    """Повторний /generate лише отримує статус; другий користувач бачить місце в черзі"""
+    async def scenario():
+        first = asyncio.create_task(handlers.generate_command(make_update(1), bot_env.context))
+        await asyncio.sleep(0.05)
+        await handlers.generate_command(make_update(1), bot_env.context)
+        second = asyncio.create_task(handlers.generate_command(make_update(2), bot_env.context))
+        await asyncio.sleep(0.05)
+        bot_env.release.set()
+        await asyncio.gather(first, second)
+
+    asyncio.run(scenario())
+    assert bot_env.bot.sent == [
+        (1, "Генерую PDF..."),
+        (1, "PDF уже генерується, зачекайте."),
+        (2, "Генерую PDF... Місце в черзі: 1."),
+        (1, b"%PDF"),
+        (2, b"%PDF"),
+    ]
+    # Кожен свіжий рендер записує свої метрики
+    assert db_session.query(RenderMetric).count() == 2
+
+
+def test_generate_reports_cancel_after_edit(bot_env):
+    """Редагування під час очікування скасовує задачу і просить повторити /generate"""
+    async def scenario():
+        first = asyncio.create_task(handlers.generate_command(make_update(1), bot_env.context))
+        second = asyncio.create_task(handlers.generate_command(make_update(2), bot_env.context))
+        await asyncio.sleep(0.05)
+        handlers.render_queue.cancel(2)  # як message_handler після нового кроку діалогу
+        await second
+        bot_env.release.set()
+        await first
+
+    asyncio.run(scenario())
+    assert (2, "Дані змінилися під час генерації. Натисніть /generate ще раз.") in bot_env.bot.sent
+    assert (2, b"%PDF") not in bot_env.bot.sent
+
+
+def test_global_render_budget_is_charged_only_for_new_renders(bot_env, monkeypatch):
+    """Повторний /generate і відповідь з кешу не витрачають глобальний бюджет рендерів"""
+    bot_env.release.set()
+    monkeypatch.setattr(handlers, "admission", AdmissionController(render_budget_per_minute=0.001, render_burst=1))
+
+    async def scenario():
+        await handlers.generate_command(make_update(1), bot_env.context)
+        await handlers.generate_command(make_update(1), bot_env.context)  # з кешу
+        await handlers.generate_command(make_update(2), bot_env.context)  # новий рендер — бюджет вичерпано
+
+    asyncio.run(scenario())
+    assert [text for _, text in bot_env.bot.sent] == [
+        "Генерую PDF...", b"%PDF", b"%PDF", "Сервер зайнятий. Спробуйте ще раз через 60000 с."]
+
+
+def test_photo_is_processed_in_its_own_pool(bot_env, db_session, monkeypatch, tmp_path):
+    """Обробка фото не займає слоти рендеру PDF"""
+    calls = []
+
+    class FakePhotoPool:
+        async def run(self, func, *args):
+            calls.append((func, args))
+            return b"jpeg"
+
+    monkeypatch.setattr(handlers, "photo_pool", FakePhotoPool())
+    monkeypatch.setattr(handlers.config, "PHOTO_CACHE_DIR", str(tmp_path))
+    user = session_manager.get_or_create_user(db_session, 1, {})
+    session_manager.update_session_context(db_session, user.id, {}, next_step=session_manager.STEP_WAITING_PHOTO)
+    photo = SimpleNamespace(file_id="f1", file_unique_id="u1", width=640, height=800, file_size=1000)
+    update = make_update(1)
+    update.message = SimpleNamespace(photo=[photo])
+
+    asyncio.run(handlers.photo_handler(update, bot_env.context))
+
+    assert calls == [(images.process_photo, (b"raw photo",))]
+    assert (tmp_path / "u1.jpg").read_bytes() == b"jpeg"
+    assert bot_env.bot.sent == [(1, "✅ Фото збережено!")]
@@ -0,0 +1,24 @@
+import io
+from types import SimpleNamespace
+from PIL import Image
+from app.pdf_generator import images
+
+
+def test_pick_smallest_adequate_photo_size():
+    """Обирається найменший варіант, не менший за розмір шаблону"""
+    sizes = [SimpleNamespace(width=w, height=w) for w in (90, 320, 800, 1280)]
+    assert images.pick_photo_size(sizes).width == 320
+    # Якщо жоден не підходить — найбільший
+    assert images.pick_photo_size(sizes[:1]).width == 90
+
+
+def test_process_photo_crops_to_template_size():
+    """Фото обрізається до пропорцій шаблону і перекодовується в JPEG"""
+    source = io.BytesIO()
+    Image.new("RGB", (1280, 720), "red").save(source, format="PNG")
+
+    result = images.process_photo(source.getvalue())
+
+    with Image.open(io.BytesIO(result)) as image:
+        assert image.format == "JPEG"
+        assert image.size == (images.PHOTO_WIDTH * images.PHOTO_SCALE, images.PHOTO_HEIGHT * images.PHOTO_SCALE)
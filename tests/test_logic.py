@@ -1,20 +1,6 @@
-import pytest
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from app.core.database import Base
 from app.models.orm import User, Session
 from app.logic import session_manager
-
-
-# Фікстура: створює тимчасову БД в оперативній пам'яті
-@pytest.fixture
-def db_session():
-    engine = create_engine("sqlite:///:memory:")
-    Base.metadata.create_all(engine)
-    SessionLocal = sessionmaker(bind=engine)
-    session = SessionLocal()
-    yield session
-    session.close()
+from app.models.schemas import MAX_DESCRIPTION_ITEMS, MAX_LONG_TEXT, MAX_SKILLS
 
 
 def test_create_user_logic(db_session):
@@ -54,3 +40,23 @@ def test_add_experience_logic(db_session):
     assert session_obj.context["experience"][0]["company"] == "Google"
     # Тимчасовий буфер має очиститися
     assert "temp_experience" not in session_obj.context
+
+
+def test_legacy_oversized_context_is_clipped_to_limits(db_session):
+    """Сесії, збережені до введення лімітів, усе ще дають валідне резюме"""
+    user = session_manager.get_or_create_user(db_session, 777, {})
+    session_manager.update_session_context(db_session, user.id, {
+        "personal": {"full_name": "Legacy User", "summary": "s" * (MAX_LONG_TEXT + 1)},
+        "experience": [{"job_title": "Dev", "company": "Acme", "start_date": "2020",
+                        "description": ["d" * (MAX_LONG_TEXT + 1)] * (MAX_DESCRIPTION_ITEMS + 5)}],
+        "skills": [f"skill {i}" for i in range(MAX_SKILLS + 20)],
+    })
+    session = session_manager.get_session_by_user(db_session, user.id)
+
+    resume = session_manager.transform_session_to_resume_data(session)
+    assert len(resume.personal.summary) == MAX_LONG_TEXT
+    assert len(resume.experience[0].description) == MAX_DESCRIPTION_ITEMS
+    assert len(resume.experience[0].description[0]) == MAX_LONG_TEXT
+    assert len(resume.skills) == MAX_SKILLS
+    # Вихідні дані в сесії не змінюються
+    assert len(session.context["skills"]) == MAX_SKILLS + 20
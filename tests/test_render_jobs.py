@@ -0,0 +1,161 @@
+import asyncio
+import threading
+import time
+import pytest
+from app.models.schemas import ResumeData
+from app.pdf_generator.jobs import RenderQueue
+from app.pdf_generator.workers import RenderWorkerPool
+
+
+def make_resume(name):
+    return ResumeData(personal={"full_name": name})
+
+
+def test_duplicate_generate_attaches_to_running_job():
+    """Повторний запит з тими самими даними не запускає новий рендер"""
+    calls = []
+    release = threading.Event()
+
+    def render(data):
+        calls.append(data.personal.full_name)
+        release.wait(timeout=5)
+        return b"%PDF"
+
+    async def scenario():
+        queue = RenderQueue(render, max_workers=1)
+        job1, attached1 = queue.submit(1, make_resume("Test User"))
+        job2, attached2 = queue.submit(1, make_resume("Test User"))
+        assert job1 is job2 and not attached1 and attached2
+        release.set()
+        assert await job1.wait() == b"%PDF"
+
+        # Після завершення повтор обслуговується з кешу
+        job3, _ = queue.submit(1, make_resume("Test User"))
+        assert job3.future.done()
+
+    asyncio.run(scenario())
+    assert calls == ["Test User"]
+
+
+def test_new_data_cancels_queued_job_and_reports_position():
+    """Нові дані скасовують застарілу задачу; позиція в черзі рахується"""
+    release = threading.Event()
+
+    def render(data):
+        release.wait(timeout=5)
+        return data.personal.full_name.encode()
+
+    async def scenario():
+        queue = RenderQueue(render, max_workers=1)
+        running, _ = queue.submit(1, make_resume("First User"))
+        stale, _ = queue.submit(2, make_resume("Old Name"))
+        assert queue.position(running) == 0
+        assert queue.position(stale) == 1
+
+        fresh, attached = queue.submit(2, make_resume("New Name"))
+        assert not attached and stale.cancelled
+        with pytest.raises(asyncio.CancelledError):
+            await stale.wait()
+
+        release.set()
+        assert await fresh.wait() == b"New Name"
+
+    asyncio.run(scenario())
+
+
+def sleepy_render(data):
+    # Виконується в окремому процесі пулу; summary — тривалість рендеру в секундах
+    time.sleep(float(data.personal.summary))
+    return data.personal.full_name.encode()
+
+
+def test_edit_during_render_kills_stale_job_and_frees_slot():
+    """Скасування задачі, що вже рендериться, вбиває процес і не тримає слот"""
+    async def scenario():
+        pool = RenderWorkerPool(size=1, timeout=60, memory_limit_mb=None, warmup_modules=())
+        try:
+            queue = RenderQueue(sleepy_render, max_workers=1, pool=pool)
+            stale, _ = queue.submit(1, ResumeData(personal={"full_name": "Old Name", "summary": "30"}))
+            await asyncio.sleep(0.5)
+            assert stale.started
+
+            fresh, _ = queue.submit(1, ResumeData(personal={"full_name": "New Name", "summary": "0"}))
+            assert stale.cancelled and queue.position(fresh) == 0
+            start = time.monotonic()
+            assert await fresh.wait() == b"New Name"
+            assert time.monotonic() - start < 15
+            assert pool.recycled == 1
+        finally:
+            pool.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_speculative_render_fills_cache_and_counts_hit():
+    """Фоновий рендер після паузи дає миттєвий /generate з кешу"""
+    calls = []
+
+    def render(data):
+        calls.append(data.personal.full_name)
+        return b"%PDF"
+
+    async def scenario():
+        queue = RenderQueue(render, max_workers=2, speculative_delay=0.01)
+        queue.speculate(1, make_resume("Test User"))
+        await asyncio.sleep(0.2)
+
+        job, attached = queue.submit(1, make_resume("Test User"))
+        assert job.future.done() and not attached
+        assert queue.stats["speculative_hits"] == 1
+        assert queue.hit_rate() == 1.0
+
+    asyncio.run(scenario())
+    assert calls == ["Test User"]
+
+
+def test_speculative_render_waits_for_foreground_jobs():
+    """Фонова задача не стартує, поки користувачі чекають у черзі"""
+    release = threading.Event()
+
+    def render(data):
+        release.wait(timeout=5)
+        return b"%PDF"
+
+    async def scenario():
+        queue = RenderQueue(render, max_workers=1, speculative_delay=0)
+        foreground, _ = queue.submit(1, make_resume("First User"))
+        queue.submit(2, make_resume("Second User"))
+        queue.speculate(3, make_resume("Third User"))
+        await asyncio.sleep(0.05)
+        assert queue.stats["speculative_started"] == 0
+
+        # Редагування скасовує заплановану фонову задачу
+        queue.cancel(3)
+        release.set()
+        await foreground.wait()
+        await asyncio.sleep(0.05)
+        assert queue.stats["speculative_started"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_speculative_render_disabled_with_single_worker():
+    """З одним слотом фоновий рендер не стартує, щоб /generate не чекав у черзі"""
+    release = threading.Event()
+
+    def render(data):
+        release.wait(timeout=5)
+        return b"%PDF"
+
+    async def scenario():
+        queue = RenderQueue(render, max_workers=1, speculative_delay=0)
+        queue.speculate(1, make_resume("First User"))
+        await asyncio.sleep(0.05)
+        assert queue.stats["speculative_started"] == 0
+
+        job, _ = queue.submit(2, make_resume("Second User"))
+        assert queue.position(job) == 0
+        release.set()
+        await job.wait()
+
+    asyncio.run(scenario())
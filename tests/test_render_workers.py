@@ -0,0 +1,59 @@
+import asyncio
+import time
+import pytest
+from app.pdf_generator.workers import RenderLimitError, RenderWorkerInitError, RenderWorkerPool, resource
+
+
+def slow_render(seconds):
+    time.sleep(seconds)
+    return b"%PDF"
+
+
+def test_timed_out_worker_is_killed_and_recycled():
+    """Рендер, що перевищив ліміт часу, вбивається, а слот продовжує працювати"""
+    async def scenario():
+        pool = RenderWorkerPool(size=1, timeout=2.0, memory_limit_mb=None, warmup_modules=())
+        try:
+            assert await pool.run(slow_render, 0) == b"%PDF"
+            with pytest.raises(RenderLimitError):
+                await pool.run(slow_render, 30)
+            assert pool.recycled == 1
+            assert await pool.run(slow_render, 0) == b"%PDF"
+        finally:
+            pool.shutdown()
+
+    asyncio.run(scenario())
+
+
+def allocate(size_mb):
+    return len(bytearray(size_mb * 1024 * 1024))
+
+
+@pytest.mark.skipif(resource is None, reason="RLIMIT_AS недоступний")
+def test_worker_over_memory_limit_is_recycled():
+    """Рендер понад ліміт пам'яті (RLIMIT_AS) перериває лише свій процес"""
+    async def scenario():
+        pool = RenderWorkerPool(size=1, timeout=20.0, memory_limit_mb=512, warmup_modules=())
+        try:
+            with pytest.raises(RenderLimitError):
+                await pool.run(allocate, 1024)
+            assert pool.recycled == 1
+            assert await pool.run(allocate, 16) == 16 * 1024 * 1024
+        finally:
+            pool.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_worker_init_failure_is_reported_separately():
+    """Помилка ініціалізації процесу не видається за перевищення ліміту пам'яті"""
+    async def scenario():
+        pool = RenderWorkerPool(size=1, timeout=20.0, memory_limit_mb=None, warmup_modules=("no_such_module",))
+        try:
+            with pytest.raises(RenderWorkerInitError, match="no_such_module"):
+                await pool.run(slow_render, 0)
+            assert pool.recycled == 0
+        finally:
+            pool.shutdown()
+
+    asyncio.run(scenario())
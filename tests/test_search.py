@@ -0,0 +1,30 @@
+from app.logic import dialog, search, session_manager
+
+
+def add_items(db, tg_id, name, skills, job_title):
+    """Емуляція діалогу: кожен завершений елемент зберігається через save_session_state"""
+    user = session_manager.get_or_create_user(db, tg_id, {})
+    db_session = session_manager.get_session_by_user(db, user.id)
+    context = {"personal": {"full_name": name}}
+    for skill in skills:
+        context = dialog.advance(dialog.begin_section(context, "skills").context, "WAITING_SKILL", skill).context
+        session_manager.save_session_state(db, db_session, context)
+    context["experience"] = [{"job_title": job_title, "company": "Acme", "description": ["APIs"]}]
+    session_manager.save_session_state(db, db_session, context)
+    return user
+
+
+def test_index_is_updated_on_commit_and_ranked(db_session):
+    """Індекс оновлюється разом із сесією; навички важать більше за посаду"""
+    python_dev = add_items(db_session, 1, "Python Dev", ["Python", "Django"], "Backend Engineer")
+    add_items(db_session, 2, "Java Dev", ["Java"], "Python Evangelist")
+    add_items(db_session, 3, "Designer", ["Figma"], "Designer")
+
+    hits = search.search(db_session, "pyth")
+    assert [hit.full_name for hit in hits] == ["Python Dev", "Java Dev"]
+    assert hits[0].user_id == python_dev.id
+
+    # Фільтр за навичкою
+    assert [hit.full_name for hit in search.search(db_session, skills=["python"])] == ["Python Dev"]
+    # Синтаксис FTS у запиті не ламає пошук
+    assert search.search(db_session, 'figma" OR *') == []
@@ -0,0 +1,95 @@
+import asyncio
+import json
+import threading
+from types import SimpleNamespace
+import pytest
+from app.bot.tenants import TENANT_KEY, Tenant, find_template, load_tenants, render_key, resolve_templates
+from app.models.orm import Template
+from app.models.schemas import ResumeData
+from app.pdf_generator.jobs import RenderQueue
+from app.pdf_generator.templating import TemplateSource, render_html
+
+
+def _write_config(tmp_path, tenants):
+    path = tmp_path / "tenants.json"
+    path.write_text(json.dumps({"tenants": tenants}), encoding="utf-8")
+    return str(path)
+
+
+def test_tenants_resolve_templates_by_name_and_language(db_session, tmp_path, monkeypatch):
+    """Бот отримує шаблон з БД (за мовою або назвою) чи файл; токен — зі змінної оточення"""
+    monkeypatch.setenv("BRAND_TOKEN", "123:brand")
+    db_session.add(Template(name="modern_en", language="en",
+                            html="<style>{{ css }}</style><h1>{{ data.personal.full_name }}</h1>", css="h1{}"))
+    db_session.commit()
+    path = _write_config(tmp_path, [
+        {"name": "main", "token": "123:main"},
+        {"name": "brand", "token_env": "BRAND_TOKEN", "language": "en", "welcome": "Welcome!"},
+        {"name": "classic", "token": "123:classic", "template": "resume_template.html"},
+    ])
+
+    main, brand, classic = resolve_templates(db_session, load_tenants(path))
+
+    assert main.template is None
+    assert brand.token == "123:brand" and brand.template.name == "modern_en"
+    assert classic.template.html is None
+    resume = ResumeData(personal={"full_name": "Іван"})
+    assert render_html(resume, template=brand.template) == "<style>h1{}</style><h1>Іван</h1>"
+
+
+def test_tenants_config_rejects_missing_token_and_duplicates(tmp_path):
+    with pytest.raises(ValueError):
+        load_tenants(_write_config(tmp_path, [{"name": "a", "token_env": "NO_SUCH_TOKEN_ENV"}]))
+    with pytest.raises(ValueError):
+        load_tenants(_write_config(tmp_path, [{"name": "a", "token": "1"}, {"name": "a", "token": "2"}]))
+
+
+def test_shared_render_queue_keys_cache_by_template(db_session):
+    """Спільна черга: однакові дані з різними шаблонами — різні документи в кеші"""
+    db_session.add(Template(name="brand", html="{{ data.personal.full_name }}"))
+    db_session.commit()
+    brand = find_template(db_session, name="brand")
+    calls = []
+
+    def fake_render(resume_data, template=None):
+        calls.append(template.name if template else None)
+        return b"pdf"
+
+    async def scenario():
+        queue = RenderQueue(fake_render, max_workers=1)
+        resume = ResumeData(personal={"full_name": "Іван"})
+        for template in (None, brand, brand, None):
+            job, _ = queue.submit(1, resume, template)
+            await job.wait()
+
+    asyncio.run(scenario())
+    assert calls == [None, "brand"]
+
+
+def test_tenants_do_not_cancel_each_others_renders():
+    """Той самий користувач у двох ботах: задачі з різними шаблонами не скасовують одна одну"""
+    release = threading.Event()
+
+    def render(resume_data, template=None):
+        release.wait(timeout=5)
+        return template.name.encode()
+
+    def context(name, template):
+        return SimpleNamespace(bot_data={TENANT_KEY: Tenant(name=name, token=name, template=template)})
+
+    brand_a, brand_b = TemplateSource("a.html"), TemplateSource("b.html")
+    context_a, context_b = context("a", brand_a), context("b", brand_b)
+    assert render_key(SimpleNamespace(bot_data={}), 1) == 1
+
+    async def scenario():
+        queue = RenderQueue(render, max_workers=2)
+        resume = ResumeData(personal={"full_name": "Іван"})
+        job_a, _ = queue.submit(render_key(context_a, 1), resume, brand_a)
+        job_b, _ = queue.submit(render_key(context_b, 1), resume, brand_b)
+        # Редагування в боті b скасовує лише його задачу
+        queue.cancel(render_key(context_b, 1))
+        release.set()
+        assert await job_a.wait() == b"a.html"
+        assert job_b.cancelled and not job_a.cancelled
+
+    asyncio.run(scenario())